@@ -1,13 +1,17 @@
 import streamlit as st
 import pandas as pd
 import folium
-from streamlit_folium import st_folium
-from folium.plugins import HeatMap 
 from streamlit_js_eval import get_geolocation
 import numpy as np
-import matplotlib.pyplot as plt
-import time
-loc = get_geolocation() 
+import uuid
+from utils import grafik
+from utils.cache import PRESISI_LOKASI_M
+from utils.cakupan import AMBANG_KM, ringkasan_cakupan
+from utils.instrumen import INSTRUMEN_SEMUA, Pengukur
+from utils.jalan import BATAS_MAKS_KM, muat_graf
+from utils.lokasi import cache_lokasi, hasil_jalan, hasil_lokasi, hasil_ubin
+from utils.peta import buat_peta_dasar, lapisan_pengguna, tampilkan_peta, url_google_maps
+from utils.ubin import muat_ubin
 
 st.set_page_config(
     page_title="GIS Bengkel Honda Jateng",
@@ -15,25 +19,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371.0 #Radius bumi dalam kilometer
-    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])#konversi derajat ke radian untuk perhitungan trigonometri
-    dlat = lat2 - lat1#selisih latitud antara dua titik
-    dlon = lon2 - lon1#selisih longitud antara dua titik
-    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2#rumus haversine untuk menghitung jarak antara dua titik di permukaan bumi berdasarkan koordinat latitud dan longitud
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))   #menghitung sudut sentral antara dua titik berdasarkan nilai a yang dihitung sebelumnya
-    distance = R * c#menghitung jarak sebenarnya antara dua titik dengan mengalikan sudut sentral (c) dengan radius bumi (R) untuk mendapatkan hasil dalam kilometer
-    return distance
+if 'id_sesi' not in st.session_state:
+    st.session_state.id_sesi = uuid.uuid4().hex[:12]#penanda sesi di log instrumen
+pengukur = Pengukur(INSTRUMEN_SEMUA or st.session_state.get('debug_performa', False), st.session_state.id_sesi)
+#waktu per tahap, hanya diukur kalau panel debug dinyalakan (atau INSTRUMEN=1), selain itu tahap() tidak melakukan apa-apa
+#memori per tahap hanya kalau INSTRUMEN_MEMORI=1, karena tracemalloc memperlambat semua sesi di proses ini
 
 def load_data():
-    df = pd.read_csv('data/bengkel_honda_jateng_final.csv')
-    return df
+    return muat_ubin('data/bengkel_honda_jateng_final.csv')#csv dibagi sekali jadi ubin berisi artefak biner, saat start hanya manifest yang dibaca
 
 try:
-    df = load_data()
+    with pengukur.tahap("muat_manifest"):
+        data_ubin = load_data()
 except:
     st.error("File 'bengkel_honda_jateng_final.csv' tidak ditemukan.")
-    df = pd.DataFrame()
+    data_ubin = None
 
 # CSS CUSTOM
 st.markdown("""
@@ -58,20 +58,27 @@ with st.sidebar:
     if 'user_lon' not in st.session_state:
         st.session_state.user_lon = DEFAULT_LON
 
-    if st.button("Gunakan Lokasi GPS Saya", use_container_width=True):#kalo tombol di klik maka akan mencoba mengambil lokasi gps
-        time.sleep#delay
+    if st.button("Gunakan Lokasi GPS Saya", width="stretch"):#kalo tombol di klik maka akan mencoba mengambil lokasi gps
+        st.session_state.minta_gps = True#komponen gps hanya dipasang setelah tombol diklik, tidak di setiap rerun
+
+    if st.session_state.get('minta_gps'):
+        loc = get_geolocation()#hasilnya None dulu, nilai dari browser datang lewat rerun berikutnya
         
         with st.status("Sedang mengambil koordinat GPS", expanded=False) as status:#status untuk menampilkan status saat mengambil koordinat gps
-            if loc and isinstance(loc, dict) and 'coords' in loc:# apakah loc ada isinya dan ada acoord di dalam nya
+            if loc is None:
+                status.update(label="Menunggu izin lokasi dari browser...", state="running", expanded=False)
+            elif isinstance(loc, dict) and 'coords' in loc:# apakah loc ada isinya dan ada acoord di dalam nya
                 #jadi kalo masuk bowrser lalu klik bagfian si lokasi gpos saya nanti ada allow lokasi
                 #nah itu kalo kita klik allow browser akan memberikan 
                 # data format nya json lalu di simoab di loc
                 st.session_state.user_lat = loc['coords']['latitude']
                 st.session_state.user_lon = loc['coords']['longitude']
+                st.session_state.minta_gps = False
                 status.update(label="Lokasi berhasil diperbarui!", state="complete", expanded=False)
                 st.success("Koordinat diperbarui!")
                 st.rerun()
             else:
+                st.session_state.minta_gps = False
                 status.update(label="Gagal mengambil lokasi!", state="error", expanded=True)
                 st.error("""
                     **Akses Ditolak/Gagal.** 1. Pastikan 'Location' di Windows Settings sudah **ON**.
@@ -94,101 +101,69 @@ with st.sidebar:
     st.info("Koordinat di atas digunakan sebagai titik pusat pencarian bengkel terdekat.")
     show_heatmap = st.checkbox("Tampilkan Heatmap", value=True)
     show_markers = st.checkbox("Tampilkan Marker Bengkel", value=True)
+    show_cakupan = st.checkbox("Tampilkan Kesenjangan Cakupan", value=False)#raster jarak ke bengkel terdekat, merah = jauh dari bengkel
+    graf_jalan = muat_graf()#None kalau file jaringan jalan tidak ada, pilihan mode jalan raya tidak ditampilkan
+    mode_jalan = graf_jalan is not None and st.radio(
+        "Mode Jarak", ["Garis Lurus", "Jalan Raya"], horizontal=True,
+        help="Jalan Raya: 3 bengkel terdekat diurutkan ulang dengan jarak lewat jaringan jalan (tanpa internet)",
+    ) == "Jalan Raya"
+    info_cache = st.empty()#diisi setelah perhitungan lokasi supaya angka hit/miss sudah termasuk rerun ini
+    st.checkbox("Panel Debug Performa", key="debug_performa", help="Waktu setiap tahap pada rerun ini, memori hanya kalau dijalankan dengan INSTRUMEN_MEMORI=1")
+    panel_debug = st.empty()#diisi di akhir script setelah semua tahap selesai diukur
     
 
 
+if data_ubin is not None:
+    with pengukur.tahap("muat_area"):
+        dataset = data_ubin.area(user_lat, user_lon)#hanya ubin di sekitar lokasi pengguna yang dimuat, dipakai bersama sesi lain di area yang sama
+    df = dataset.df#dataframe dipakai bersama semua sesi jadi tidak boleh diubah (read only)
+else:
+    dataset = None
+    df = pd.DataFrame()
+
 # Logic hitung lokasi terdekat
 if not df.empty:
-    df['Jarak_KM'] = df.apply(
-        lambda row: haversine(user_lat, user_lon, row['Latitude'], row['Longitude']), #menghitung jarak antara lokasi pengguna dengan setiap 
-        #bengkel menggunakan fungsi haversine yang sudah didefinisikan sebelumnya, hasilnya disimpan di kolom baru 'Jarak_KM'
-        axis=1#menerapkan fungsi ke setiap baris di dataset
-    )
-    df_terdekat = df.sort_values('Jarak_KM').head(3)#cari 3 bengkel terdekat dengan mengurutkan berdasarkan kolom 'Jarak_KM' dan mengambil 3 baris teratas
+    with pengukur.tahap("hitung_jarak"):
+        metrik = hasil_lokasi(dataset, user_lat, user_lon, k=3)#jarak, 3 terdekat dan metrik jarak di cache per lokasi yang dibulatkan ke grid PRESISI_LOKASI_M
+        #lokasi yang bergeser beberapa meter memakai hasil yang sama, jadi tidak dihitung ulang
+    jarak = metrik['jarak']#jarak dari lokasi pengguna ke setiap bengkel, disimpan terpisah dari df supaya dataframe bersama tidak disalin per sesi
+    with pengukur.tahap("bengkel_terdekat"):
+        df_terdekat = hasil_ubin(data_ubin, user_lat, user_lon, k=3)#cincin ubin diperluas sampai 3 terdekat pasti benar, walau di luar area yang dimuat
+    if mode_jalan:
+        #kandidat dipilih dengan garis lurus lalu diurutkan ulang dengan jarak jalan, bengkel yang tidak terjangkau tetap pakai garis lurus
+        with pengukur.tahap("jarak_jalan"):
+            jalan = hasil_jalan(dataset, graf_jalan, user_lat, user_lon, k=3)
+        df_terdekat = df.iloc[jalan['posisi_terdekat']].assign(
+            Jarak_KM=np.where(np.isfinite(jalan['jarak_jalan']), jalan['jarak_jalan'], jalan['jarak_lurus']),
+            Jarak_Lurus_KM=jalan['jarak_lurus'],
+        )
 
 # Main Layout
 st.subheader("Peta Persebaran")
-m = folium.Map(location=[user_lat, user_lon], zoom_start=9)#
-
-# 1. HEATMAP 
-if show_heatmap and not df.empty:
-    df_kab = (
-        df.groupby("Wilayah")
-        .agg({
-            "Latitude": "mean",#menghitung rata-rata latitude untuk setiap wilayah
-            "Longitude": "mean",#menghitung rata-rata longitude untuk setiap wilayah
-            "Nama": "count"#menghitung jumlah bengkel di setiap wilayah 
-        })
-        .reset_index()
-        .rename(columns={"Nama": "Jumlah_Bengkel"})
-    )
-
-    heat_data = [
-        [row["Latitude"], row["Longitude"], row["Jumlah_Bengkel"]]
-        for _, row in df_kab.iterrows()#membuat list heat_data yang berisi koordinat latitude, longitude, dan jumlah bengkel untuk setiap wilayah dengan iterasi melalui setiap baris di df_kab menggunakan iterrows()
-    ]
-#ddd
-    HeatMap(
-        heat_data,
-        radius=40,#kalo radius semakin besar maka area panas akan semakin luas, tapi detail titik panas akan berkurang
-        blur=25,
-        max_zoom=10
-    ).add_to(m)
-
-
-# 2. MARKER PENGGUNA
 
-folium.Marker(
-    location=[user_lat, user_lon],
-    popup="<b>Lokasi Anda Sekarang</b>",
-    icon=folium.Icon(color='red', icon='user', prefix='fa'),
-    z_index_offset=1000
-).add_to(m)
+@st.cache_resource(max_entries=8)
+def peta_dasar(versi, show_heatmap, show_markers, show_cakupan, _dataset):
+    return buat_peta_dasar(_dataset, show_heatmap, show_markers, show_cakupan)#heatmap dan marker bengkel hanya dibangun sekali per versi dataset
 
-# 3. MARKER BENGKEL 
-if show_markers and not df.empty:
-    for i, row in df.iterrows():
-        if pd.isna(row['Latitude']) or abs(row['Latitude']) > 90:#kalo latitude kosong atau nilai
-            #latitude lebih besar dari 90 maka data dianggap tidak valid dan di skip
-            continue
-            
-        warna = 'green' if row['Nama'] in df_terdekat['Nama'].values else 'blue'
-        #kalo nama bengkel ada di daftar bengkel terdekat maka warna marker nya hijau, kalo tidak maka warna marker nya biru
-        google_maps_url = f"https://www.google.com/maps/dir/?api=1&origin={user_lat},{
-            #bagian userlat lot lokasi user kalo rrow latitude longtiutde bagian bengkel
-            user_lon}&destination={row['Latitude']},{row['Longitude']}&travelmode=driving"
-            #gimana ya ini tu jadi kaya kita rancang href kita sendiri pake lat lot yang uda di tentuin
-            #jadi nanti kalo kita klik petunjuk arah dia akan bawa kita ke google maps dengan tujuan koordinat bengkel yang di klik dan asalnya koordinat pengguna
-            #travelmode=driving untuk menentukan mode perjalanan sebagai openegmudi nmotot
+if not df.empty:
+    with pengukur.tahap("peta_dasar"):
+        m = peta_dasar(dataset.versi, show_heatmap, show_markers, show_cakupan, dataset)
+    fg = lapisan_pengguna(user_lat, user_lon, df_terdekat)#marker pengguna dan 3 bengkel terdekat, dibuat ulang tiap lokasi berubah
+else:
+    m = folium.Map(location=[user_lat, user_lon], zoom_start=9)
+    fg = lapisan_pengguna(user_lat, user_lon)
 
-        popup_html = f"""
-            <div style="font-family: Arial, sans-serif; font-size: 12px; width: 200px; color: canvastext; 
-            background-color: canvas;">
-            <b style="font-size:14px; color:#e74c3c;">{row['Nama']}</b><br>
-            <b>Alamat:</b> {row['Alamat']}<br>
-            <b>Wilayah:</b> {row['Wilayah']}<br>
-            <hr style="margin:5px 0; border: 0; border-top: 1px solid #ccc;">
-            <b>Jarak:</b> {row['Jarak_KM']:.2f} KM<br><br>
-            
-            <a href="{google_maps_url}" target="_blank" 
-            style="display: block; text-align: center; 
-                    background-color: #2980b9; color: white; 
-                    padding: 8px; border-radius: 5px; 
-                    text-decoration: none; font-weight: bold;">
-                Petunjuk Arah (Maps)
-            </a>
-            </div>
-        """
-        folium.Marker(
-            location=[row['Latitude'], row['Longitude']],
-            popup=folium.Popup(popup_html, max_width=250),
-            icon=folium.Icon(color=warna)
-        ).add_to(m)
+info_cache.caption(
+    f"Cache lokasi (presisi {PRESISI_LOKASI_M} m): {cache_lokasi.hit} hit, {cache_lokasi.miss} miss, {len(cache_lokasi)} entri"
+)
 
-st_folium(m, width="100%", height=500)
+with pengukur.tahap("st_folium"):
+    tampilkan_peta(m, fg, center=[user_lat, user_lon], key="peta", width="100%", height=500)
 
 st.divider()
 st.header(" 3 Bengkel Terdekat")
+if mode_jalan:
+    st.caption(f"Jarak lewat jaringan jalan. Bengkel yang tidak terjangkau dalam {BATAS_MAKS_KM:.0f} KM memakai jarak garis lurus.")
 
 if not df.empty:
     cols = st.columns(3)#buat 3 kolom sejajar kesamping
@@ -207,79 +182,101 @@ if not df.empty:
                     <p style="font-size: 13px; color: #555; height: 50px; overflow: hidden;">
                         {row['Alamat']}
                     </p>
-                    <p style="margin-bottom: 5px;">Jarak: <b>{row['Jarak_KM']:.2f} KM</b></p>
+                    <p style="margin-bottom: 5px;">Jarak: <b>{row['Jarak_KM']:.2f} KM</b>{f" <small>(garis lurus {row['Jarak_Lurus_KM']:.2f} KM)</small>" if mode_jalan else ""}</p>
                     <small style="color: #888;">{row['Wilayah']}</small>
                 </div>
             """, unsafe_allow_html=True)
-            google_maps_url = f"https://www.google.com/maps/dir/?api=1&origin={user_lat},{user_lon}&destination={row['Latitude']},{row['Longitude']}&travelmode=driving"
-            st.link_button("Buka Google Maps", google_maps_url, use_container_width=True)
+            google_maps_url = url_google_maps(user_lat, user_lon, row['Latitude'], row['Longitude'])
+            st.link_button("Buka Google Maps", google_maps_url, width="stretch")
 
 
 st.divider()
-with st.expander("Lihat Statistik dan Analisis Data Spasial", expanded=False):
-    st.markdown("Ringkasan Strategis")
-    col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
-    with col_kpi1:
-        st.metric(label="Total Bengkel Terdata", value=len(df))
-        #menampilkan total jumlah bengkel yang terdata di dataset dengan menggunakan st.metric untuk menampilkan angka tersebut dengan label "Total Bengkel Terdata"
-    with col_kpi2:
-        jarak_min = df['Jarak_KM'].min()
-        st.metric(label="Bengkel Terdekat", value=f"{jarak_min:.2f} KM")
-        #menampilkan jarak terdekat dari lokasi pengguna ke bengkel terdekat dengan mengambil nilai minimum dari kolom 'Jarak_KM' dan menampilkannya dengan label "Bengkel Terdekat"
-    with col_kpi3:
-        max_kab = df['Wilayah'].value_counts().idxmax()
-        st.metric(label="Pusat Kepadatan Bengkel", value=max_kab)
-        #menampilkan wilayah dengan jumlah bengkel terbanyak dengan menggunakan value_counts untuk menghitung jumlah bengkel di setiap wilayah dan idxmax untuk mendapatkan nama wilayah dengan jumlah terbanyak, lalu menampilkannya dengan label "Pusat Kepadatan Bengkel"
+expander_statistik = st.expander("Lihat Statistik dan Analisis Data Spasial", expanded=False, key="expander_statistik", on_change="rerun")
+with expander_statistik, pengukur.tahap("bagian_statistik"):
+    if expander_statistik.open and not df.empty:#grafik hanya dihitung kalau bagian statistik sedang dibuka
+        with pengukur.tahap("statistik_wilayah"):
+            statistik = dataset.statistik#agregat per wilayah (butuh raster cakupan) baru dimuat saat bagian ini dibuka
+        st.markdown("Ringkasan Strategis")
+        col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
+        with col_kpi1:
+            st.metric(label="Total Bengkel Terdata", value=int(statistik['Jumlah_Bengkel'].sum()))
+            #menampilkan total jumlah bengkel yang terdata di dataset dengan menggunakan st.metric untuk menampilkan angka tersebut dengan label "Total Bengkel Terdata"
+        with col_kpi2:
+            jarak_min = metrik['jarak_min']
+            st.metric(label="Bengkel Terdekat", value=f"{jarak_min:.2f} KM")
+            #menampilkan jarak terdekat dari lokasi pengguna ke bengkel terdekat dengan mengambil nilai minimum dari kolom 'Jarak_KM' dan menampilkannya dengan label "Bengkel Terdekat"
+        with col_kpi3:
+            max_kab = statistik['Wilayah'].iloc[0]
+            st.metric(label="Pusat Kepadatan Bengkel", value=max_kab)
+            #menampilkan wilayah dengan jumlah bengkel terbanyak, tabel statistik sudah urut dari wilayah dengan bengkel terbanyak
 
-    st.divider()
-    st.markdown("Analisis Kesenjangan Wilayah")
-    col_kab1, col_kab2 = st.columns(2)#buat dua kolom sejajar untuk menampilkan analisis kesenjangan wilayah
+        st.divider()
+        st.markdown("Analisis Kesenjangan Wilayah")
+        ringkasan = ringkasan_cakupan(dataset.cakupan, AMBANG_KM)#dihitung dari raster jarak yang sudah disimpan, bukan per wilayah
+        col_gap1, col_gap2, col_gap3 = st.columns(3)
+        with col_gap1:
+            st.metric(label=f"Area > {AMBANG_KM} KM dari Bengkel", value=f"{ringkasan['persen_jauh']:.1f}%")
+        with col_gap2:
+            st.metric(label="Luas Area Kurang Terlayani", value=f"{ringkasan['luas_jauh_km2']:,.0f} km²")
+        with col_gap3:
+            st.metric(label="Jarak Terjauh ke Bengkel", value=f"{ringkasan['jarak_maks']:.2f} KM")
+        st.caption("Area layanan didekati dengan convex hull seluruh bengkel, jadi sebagian laut di pesisir ikut terhitung.")
+        col_kab1, col_kab2 = st.columns(2)#buat dua kolom sejajar untuk menampilkan analisis kesenjangan wilayah
     
-    with col_kab1:
-        st.write("5 Wilayah Dengan Bengkel Terpadat")
-        data_kab_top = df['Wilayah'].value_counts().head(5)#menghitung jumlah bengkel di setiap wilayah dengan value_counts lalu mengambil 5 wilayah teratas dengan head(5)
-        st.bar_chart(data_kab_top)
+        with col_kab1:
+            st.write("5 Wilayah Dengan Bengkel Terpadat")
+            data_kab_top = statistik.set_index('Wilayah')['Jumlah_Bengkel'].head(5)#5 wilayah teratas dari tabel statistik yang sudah urut
+            st.bar_chart(data_kab_top)
     
-    with col_kab2:
-        st.write("5 Wilayah dengan Potensi Pengembangan Tinggi")
-        data_kab_bottom = df['Wilayah'].value_counts().tail(5).sort_values(ascending=True)#menghitung jumlah bengkel di setiap wilayah dengan value_counts lalu mengambil 5 wilayah terbawah dengan tail(5) dan mengurutkannya secara ascending untuk menampilkan wilayah dengan jumlah bengkel paling sedikit di atas
-        fig_gap, ax_gap = plt.subplots(figsize=(10, 6.5)) #buat figure dan axis untuk menampilkan grafik gap wilayah dengan ukuran yang lebih besar agar lebih jelas
-        bars = ax_gap.barh(data_kab_bottom.index, data_kab_bottom.values, color='orange')
-        ax_gap.bar_label(bars, padding=3)
-        ax_gap.set_xlabel("Jumlah Bengkel Resmi")
-        ax_gap.set_title("Wilayah dengan Cakupan Layanan Terendah")
-        st.pyplot(fig_gap)
+        with col_kab2:
+            st.write("5 Wilayah dengan Potensi Pengembangan Tinggi")
+            data_kab_bottom = statistik.set_index('Wilayah')['Jumlah_Bengkel'].tail(5).sort_values(ascending=True)#5 wilayah terbawah diurutkan secara ascending untuk menampilkan wilayah dengan jumlah bengkel paling sedikit di atas
+            st.image(grafik.render("gap", [dataset.versi], lambda: grafik.grafik_gap(data_kab_bottom)))#png di cache per versi dataset
 
-    st.divider()
+        st.write("Kepadatan Bengkel per Luas Area Layanan")
+        st.dataframe(
+            statistik[['Peringkat', 'Wilayah', 'Jumlah_Bengkel', 'Luas_Layanan_KM2', 'Bengkel_per_100KM2']],
+            width="stretch", height=200, hide_index=True,
+        )#luas area layanan = luas sel raster cakupan yang bengkel terdekatnya ada di wilayah tersebut
 
-    #analsisi spasial
-    st.markdown("Analisis Jangkauan & Aksesibilitas")
-    col_dist1, col_dist2 = st.columns(2)#buat dua kolom sejajar untuk menampilkan analisis jangkauan dan aksesibilitas
+        st.divider()
 
-    with col_dist1:
-        st.write("Kepadatan Jangkauan (Histogram)")
-        fig_dist, ax_dist = plt.subplots()
-        ax_dist.hist(df['Jarak_KM'], bins=20, color='skyblue', edgecolor='black')#membuat histogram untuk menampilkan distribusi jarak bengkel dengan menggunakan kolom 'Jarak_KM' dengan 20 bin, warna biru muda, dan garis tepi hitam untuk membedakan setiap bar
-        ax_dist.set_xlabel("Jarak (KM)")
-        ax_dist.set_ylabel("Frekuensi")
-        st.pyplot(fig_dist)
+        #analsisi spasial
+        st.markdown("Analisis Jangkauan & Aksesibilitas")
+        col_dist1, col_dist2 = st.columns(2)#buat dua kolom sejajar untuk menampilkan analisis jangkauan dan aksesibilitas
+        kunci_grafik = [dataset.versi, *metrik['kunci']]#grafik jarak di cache per versi dataset dan lokasi yang dibulatkan
+
+        with col_dist1:
+            st.write("Kepadatan Jangkauan (Histogram)")
+            st.image(grafik.render("histogram", kunci_grafik, lambda: grafik.grafik_histogram(jarak)))
         
-        st.write("Sebaran Outlier Jarak (Box Plot)")
-        fig_box, ax_box = plt.subplots(figsize=(10, 3))
-        ax_box.boxplot(df['Jarak_KM'], vert=False, patch_artist=True, 
-                        boxprops=dict(facecolor='lightgreen'))#membuat box plot untuk menampilkan sebaran jarak bengkel dengan menggunakan kolom 'Jarak_KM', orientasi horizontal, warna hijau muda untuk kotak, dan menampilkan garis median di dalam kotak
-        ax_box.set_xlabel("Jarak (KM)")
-        st.pyplot(fig_box)
+            st.write("Sebaran Outlier Jarak (Box Plot)")
+            st.image(grafik.render("boxplot", kunci_grafik, lambda: grafik.grafik_boxplot(jarak)))
+
+        with col_dist2:
+            st.write("Kurva Aksesibilitas Kumulatif")
+            df_sorted = pd.DataFrame({
+                'Jarak_KM': metrik['jarak_urut'],
+                'Kumulatif_Bengkel': np.arange(1, len(metrik['jarak_urut']) + 1),#angka urut dari 1 hingga jumlah total bengkel untuk menunjukkan jumlah kumulatif bengkel yang dapat diakses dalam jarak tertentu
+            })
+            st.line_chart(df_sorted.set_index('Jarak_KM')['Kumulatif_Bengkel'])#membuat grafik garis untuk menampilkan kurva aksesibilitas kumulatif dengan menggunakan kolom 'Jarak_KM' sebagai sumbu x dan 'Kumulatif_Bengkel' sebagai sumbu y, sehingga dapat melihat bagaimana jumlah bengkel yang dapat diakses meningkat seiring bertambahnya jarak
+            st.write("Data Bengkel Dalam Radius Dekat (< 10 KM)")
+            posisi_dekat = metrik['posisi_dekat']#bengkel dalam radius 10 KM, sudah urut dari hasil argsort di atas
+            bengkel_dekat = df.iloc[posisi_dekat][['Nama']].assign(Jarak_KM=metrik['jarak_urut'][:len(posisi_dekat)])
+            if not bengkel_dekat.empty:
+                st.dataframe(bengkel_dekat, width="stretch", height=200)
+            else:
+                st.warning(f"Tidak ada bengkel ditemukan dalam radius 10 KM dari lokasi ({user_lat:.4f}, {user_lon:.4f}).")
+                st.info("Coba pindahkan lokasi atau gunakan GPS jika tersedia.")
 
-    with col_dist2:
-        st.write("Kurva Aksesibilitas Kumulatif")
-        df_sorted = df.sort_values('Jarak_KM')
-        df_sorted['Kumulatif_Bengkel'] = range(1, len(df_sorted) + 1)#membuat kolom baru 'Kumulatif_Bengkel' yang berisi angka urut dari 1 hingga jumlah total bengkel untuk menunjukkan jumlah kumulatif bengkel yang dapat diakses dalam jarak tertentu
-        st.line_chart(df_sorted.set_index('Jarak_KM')['Kumulatif_Bengkel'])#membuat grafik garis untuk menampilkan kurva aksesibilitas kumulatif dengan menggunakan kolom 'Jarak_KM' sebagai sumbu x dan 'Kumulatif_Bengkel' sebagai sumbu y, sehingga dapat melihat bagaimana jumlah bengkel yang dapat diakses meningkat seiring bertambahnya jarak
-        st.write("Data Bengkel Dalam Radius Dekat (< 10 KM)")
-        bengkel_dekat = df[df['Jarak_KM'] <= 10][['Nama', 'Jarak_KM']].sort_values('Jarak_KM')#membuat dataframe baru 'bengkel_dekat
-        if not bengkel_dekat.empty:
-            st.dataframe(bengkel_dekat, use_container_width=True, height=200)
-        else:
-            st.warning(f"Tidak ada bengkel ditemukan dalam radius 10 KM dari lokasi ({user_lat:.4f}, {user_lon:.4f}).")
-            st.info("Coba pindahkan lokasi atau gunakan GPS jika tersedia.")
\ No newline at end of file
+pengukur.selesai(dataset.versi if dataset is not None else None)#satu baris json per rerun ke data/log/instrumen.jsonl
+if st.session_state.get('debug_performa'):
+    with panel_debug.container():
+        st.caption(f"Rerun terakhir: {pengukur.total_ms:.0f} ms, sesi {st.session_state.id_sesi}")
+        tabel_tahap = pd.DataFrame(pengukur.tahap_selesai, columns=['Tahap', 'Waktu_ms', 'Memori_KB']).round(1)
+        if not pengukur.memori:
+            tabel_tahap = tabel_tahap.drop(columns='Memori_KB')
+            st.caption("Memori tidak diukur. Jalankan dengan INSTRUMEN_MEMORI=1 untuk mengukurnya (memperlambat semua sesi selama diukur).")
+        elif tabel_tahap['Memori_KB'].isna().any():
+            st.caption("Memori kosong: tahap berjalan bersamaan dengan sesi lain yang juga diukur.")
+        st.dataframe(tabel_tahap, width="stretch", hide_index=True)
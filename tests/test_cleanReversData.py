@@ -0,0 +1,53 @@
+import pandas as pd
+
+from utils.cleanReversData import UKURAN_CHUNK, bersihkan
+
+
+def tulis_mentah(path, baris):
+    pd.DataFrame(baris, columns=["Nama", "Alamat", "Wilayah", "Latitude", "Longitude"]).to_csv(path, index=False)
+
+
+def jalankan(tmp_path, chunksize=UKURAN_CHUNK):
+    output = tmp_path / f"bersih_{chunksize}.csv"
+    ditolak = tmp_path / f"ditolak_{chunksize}.csv"
+    total = bersihkan(tmp_path / "mentah.csv", output, ditolak, chunksize)
+    return total, pd.read_csv(output), pd.read_csv(ditolak)
+
+
+MENTAH = [
+    ["Honda Siliwangi", "Jl. A", ", Kembangarum, Kota Semarang, Jawa Tengah", -6.98498, 110.38954],
+    ["Honda Banyumanik", "Jl. B", "Banyumanik, Kota Semarang, Jawa Tengah", 110.42151, -7.07034],#koordinat terbalik
+    ["Honda Jakarta", "Jl. C", "Gambir, Kota Jakarta Pusat, DKI Jakarta", -6.17539, 106.82718],#di luar kotak Jawa Tengah
+    ["Honda Kosong", "Jl. D", "Kota Semarang, Jawa Tengah", None, 110.4],
+    #tiga bengkel bernama sama berjajar sekitar 110 m, hanya yang pertama disimpan
+    ["Maju Motor", "Jl. E", "Kudus, Kabupaten Kudus, Jawa Tengah", -6.8055, 110.8405],
+    ["Maju Motor", "Jl. E", "Kudus, Kabupaten Kudus, Jawa Tengah", -6.8055, 110.8415],
+    ["MAJU  MOTOR", "Jl. E", "Kudus, Kabupaten Kudus, Jawa Tengah", -6.8055, 110.8425],
+    ["Maju Motor", "Jl. F", "Jekulo, Kabupaten Kudus, Jawa Tengah", -6.8050, 110.9000],#nama sama tapi jauh, bukan duplikat
+]
+
+
+def test_bersihkan(tmp_path):
+    tulis_mentah(tmp_path / "mentah.csv", MENTAH)
+    total, bersih, ditolak = jalankan(tmp_path)
+    assert total == {"dibaca": 8, "diterima": 4, "ditolak": 4, "dibalik": 1}
+
+    bersih = bersih.set_index("Alamat")
+    assert bersih.loc["Jl. B", ["Latitude", "Longitude"]].tolist() == [-7.07034, 110.42151]
+    assert bersih.loc["Jl. A", "Wilayah"] == "Kota Semarang"
+    assert bersih.loc["Jl. E", "Longitude"] == 110.8405
+    assert "Jl. F" in bersih.index
+
+    alasan = dict(zip(ditolak["Nama"] + "@" + ditolak["Longitude"].astype(str), ditolak["Alasan"]))
+    assert alasan["Honda Jakarta@106.82718"] == "di_luar_batas"
+    assert alasan["Honda Kosong@110.4"] == "data_kosong"
+    assert sorted(a for k, a in alasan.items() if k.lower().startswith("maju")) == ["duplikat", "duplikat"]
+
+
+def test_hasil_sama_untuk_semua_ukuran_chunk(tmp_path):
+    tulis_mentah(tmp_path / "mentah.csv", MENTAH * 3)
+    hasil = [jalankan(tmp_path, chunksize) for chunksize in (1, 2, 3, UKURAN_CHUNK)]
+    for total, bersih, ditolak in hasil[1:]:
+        assert total == hasil[0][0]
+        pd.testing.assert_frame_equal(bersih, hasil[0][1])
+        pd.testing.assert_frame_equal(ditolak, hasil[0][2])
@@ -0,0 +1,49 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import utils.cakupan
+from utils.dataset import Dataset
+
+
+def dataset_kecil(folder, n=200):
+    rng = np.random.default_rng(0)
+    return Dataset(pd.DataFrame({
+        "Nama": [f"Bengkel {i}" for i in range(n)],
+        "Alamat": "Jl. Raya",
+        "Wilayah": rng.choice(["Kota A", "Kabupaten B"], n),
+        "Latitude": rng.uniform(-7.2, -6.8, n),
+        "Longitude": rng.uniform(110.2, 110.6, n),
+    }), "uji", str(folder))
+
+
+def test_cakupan_dibangun_sekali_walau_diminta_bersamaan(tmp_path, monkeypatch):
+    ds = dataset_kecil(tmp_path)
+    dipanggil = []
+    hitung_asli = utils.cakupan.hitung_cakupan
+
+    def hitung(*args, **kwargs):
+        dipanggil.append(1)
+        return hitung_asli(*args, **kwargs)
+
+    monkeypatch.setattr(utils.cakupan, "hitung_cakupan", hitung)
+    mulai = threading.Barrier(4)
+    hasil, gagal = [], []
+
+    def sesi():
+        mulai.wait()
+        try:
+            hasil.append(ds.statistik)
+        except Exception as e:
+            gagal.append(e)
+
+    thread = [threading.Thread(target=sesi) for _ in range(4)]
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+    assert not gagal
+    assert len(dipanggil) == 1
+    assert all(h is hasil[0] for h in hasil)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cakupan-0.005.npz", "statistik_wilayah.csv"]
@@ -0,0 +1,61 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from utils.instrumen import Pengukur
+
+
+def test_default_hanya_waktu():
+    pengukur = Pengukur(True, "a")
+    with pengukur.tahap("waktu"):
+        assert not tracemalloc.is_tracing()
+    nama, ms, kb = pengukur.tahap_selesai[0]
+    assert ms >= 0 and kb is None
+
+
+def test_tracemalloc_mati_walau_tahap_gagal():
+    pengukur = Pengukur(True, "a", memori=True)
+    with pytest.raises(RuntimeError):
+        with pengukur.tahap("gagal"):
+            assert tracemalloc.is_tracing()
+            raise RuntimeError
+    assert not tracemalloc.is_tracing()
+    assert pengukur.tahap_selesai[0][0] == "gagal"
+
+
+def test_memori_tahap_bersarang():
+    pengukur = Pengukur(True, "a", memori=True)
+    with pengukur.tahap("luar"):
+        besar = bytearray(4 * 2**20)
+        del besar
+        with pengukur.tahap("dalam"):
+            kecil = bytearray(2**20)
+            del kecil
+    assert not tracemalloc.is_tracing()
+    (_, _, dalam), (_, _, luar) = pengukur.tahap_selesai
+    assert 1000 < dalam < 2000
+    assert luar > 4000#puncak sebelum tahap dalam direset tetap tercatat untuk tahap luar
+
+
+def test_memori_tidak_dicatat_kalau_sesi_lain_bersamaan():
+    a, b = Pengukur(True, "a", memori=True), Pengukur(True, "b", memori=True)
+    mulai_b, selesai_b = threading.Event(), threading.Event()
+
+    def sesi_b():
+        with b.tahap("b"):
+            mulai_b.set()
+            selesai_b.wait()
+
+    thread = threading.Thread(target=sesi_b)
+    with a.tahap("a"):
+        thread.start()
+        mulai_b.wait()
+        selesai_b.set()
+        thread.join()
+    with a.tahap("sendiri"):
+        pass
+    assert not tracemalloc.is_tracing()
+    assert a.tahap_selesai[0][2] is None
+    assert b.tahap_selesai[0][2] is None
+    assert a.tahap_selesai[1][2] is not None
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+
+from utils.jalan import TEMPEL_MAKS_KM, GrafJalan, bangun_graf, muat_graf, terdekat_jalan
+from utils.jarak import IndeksJarak
+
+
+def graf_kotak(lat0=-7.0, lon0=110.0, jumlah=11, jarak=0.01):
+    #jaringan jalan berbentuk kotak-kotak sekitar 11 x 11 km
+    nilai_lat = lat0 + jarak * np.arange(jumlah)
+    nilai_lon = lon0 + jarak * np.arange(jumlah)
+    garis = [np.column_stack([np.full(jumlah, a), nilai_lon]) for a in nilai_lat]
+    garis += [np.column_stack([nilai_lat, np.full(jumlah, b)]) for b in nilai_lon]
+    data = bangun_graf(garis, np.zeros(len(garis), dtype=np.int8))
+    return GrafJalan(data["indptr"], data["indices"], data["bobot"], data["lat"], data["lon"], "uji")
+
+
+def test_jarak_jalan_di_dalam_cakupan():
+    graf = graf_kotak()
+    jarak = graf.jarak_jalan(-7.0, 110.0, np.array([-6.95, -6.9]), np.array([110.05, 110.1]))
+    assert np.all(np.isfinite(jarak))
+    assert np.all(jarak >= np.array([7.8, 15.6]))#jalan kotak-kotak lebih panjang dari garis lurus
+
+
+def test_batas_termasuk_jarak_tempel_asal():
+    graf = graf_kotak()
+    lat, lon = -7.0, 110.0 - 0.015#sekitar 1.7 km di barat simpul terdekat
+    _, tempel = graf.simpul_terdekat(lat, lon)
+    assert tempel[0] < TEMPEL_MAKS_KM
+    jarak = graf.jarak_jalan(lat, lon, np.array([-7.0]), np.array([110.01]), batas_km=2.0)
+    assert np.isinf(jarak[0])#1.1 km di jalan + 1.7 km tempel melewati batas 2 km
+    jarak = graf.jarak_jalan(lat, lon, np.array([-7.0]), np.array([110.01]), batas_km=3.0)
+    assert np.isfinite(jarak[0])
+
+
+def test_pengguna_di_luar_cakupan_pakai_garis_lurus():
+    #pengguna jauh dari ujung jaringan jalan, bengkel di luar jaringan dekat pengguna dan di dalam jaringan jauh
+    graf = graf_kotak()
+    lat = np.array([-7.3, -6.95, -7.32, -6.9])
+    lon = np.array([110.05, 110.05, 110.05, 110.1])
+    indeks = IndeksJarak(lat, lon)
+    posisi, jarak_jalan, jarak_lurus = terdekat_jalan(graf, indeks, -7.31, 110.05, k=3)
+    assert np.all(np.isinf(jarak_jalan))
+    assert list(posisi) == [0, 2, 1]
+    assert np.all(np.diff(jarak_lurus) >= 0)
+
+
+def test_bengkel_di_luar_cakupan_tidak_diberi_jarak_jalan():
+    graf = graf_kotak()
+    jarak = graf.jarak_jalan(-6.95, 110.05, np.array([-6.94, -7.3]), np.array([110.05, 110.05]))
+    assert np.isfinite(jarak[0])
+    assert np.isinf(jarak[1])
+
+
+def test_muat_graf_dari_geojson(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)#graf disimpan ke data/cache relatif terhadap folder kerja
+    fitur = [
+        {"type": "Feature", "properties": {}, "geometry": {"type": "LineString", "coordinates": [[110.0, -7.0], [110.01, -7.0], [110.02, -7.0]]}},
+        {"type": "Feature", "properties": {"oneway": "yes"}, "geometry": {"type": "LineString", "coordinates": [[110.01, -7.0], [110.01, -6.99]]}},
+    ]
+    with open("jalan.geojson", "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": fitur}, f)
+    graf = muat_graf("jalan.geojson")
+    assert len(graf) == 4
+    assert muat_graf("jalan.geojson") is graf#dipakai ulang selama file tidak berubah
+    assert muat_graf("tidak_ada.geojson") is None
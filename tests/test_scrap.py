@@ -0,0 +1,52 @@
+import argparse
+import functools
+import glob
+import http.server
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("selenium")
+from selenium.common.exceptions import WebDriverException
+
+from utils import scrap
+
+FOLDER_FIXTURE = os.path.join(os.path.dirname(__file__), os.pardir, "utils", "fixtures")
+
+
+@pytest.fixture(scope="module")
+def url_fixture():
+    #utils/fixtures/dealer.html disajikan lewat http lokal, sama seperti petunjuk uji offline di scrap.py
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=FOLDER_FIXTURE)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/dealer.html"
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def ada_chrome():
+    try:
+        scrap.buat_driver(headless=True).quit()
+    except WebDriverException as e:
+        pytest.skip(f"chromedriver tidak tersedia: {e.msg}")
+
+
+def test_mode_otomatis(url_fixture, ada_chrome, tmp_path):
+    args = argparse.Namespace(url=url_fixture, headless=True, workers=2, provinsi=None, checkpoint=str(tmp_path))
+    scrap.mode_otomatis(args)
+
+    output = tmp_path / "bengkel.csv"
+    assert scrap.gabung_checkpoint(str(tmp_path), str(output)) == 10
+    df = pd.read_csv(output)
+    assert set(df["Nama"]) >= {"Astra Motor Siliwangi", "Honda Banyumanik", "Honda Jekulo", "Honda Malioboro"}
+    assert len(glob.glob(str(tmp_path / "jawa_tengah__kota_semarang" / "hal_*.json"))) == 3
+    #kota tanpa dealer ditandai selesai karena pesan hasil kosong, bukan karena timeout
+    assert (tmp_path / "jawa_tengah__kabupaten_karimun" / "selesai.json").exists()
+    assert len(glob.glob(str(tmp_path / "*" / "selesai.json"))) == 4
+
+    scrap.mode_otomatis(args)#run kedua: semua tugas sudah selesai, tidak ada halaman baru
+    assert scrap.gabung_checkpoint(str(tmp_path), str(output)) == 10
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import utils.dataset
+from utils.dataset import versi_file
+from utils.jarak import IndeksJarak
+from utils.ubin import muat_ubin
+
+KOLOM = ["Nama", "Alamat", "Wilayah", "Latitude", "Longitude"]
+
+
+def test_csv_tanpa_baris(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)#artefak ditulis ke data/cache relatif terhadap folder kerja
+    pd.DataFrame(columns=KOLOM).to_csv("kosong.csv", index=False)
+    data = muat_ubin("kosong.csv")
+    assert len(data) == 0
+    assert data.area(-6.99, 110.42).df.empty
+    assert data.terdekat(-6.99, 110.42).empty
+
+
+def data_tersebar(n=6000, seed=0):
+    #bengkel tersebar di banyak ubin, sebagian mengumpul dekat batas ubin supaya pencarian cincin benar-benar diuji
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([rng.uniform(-9, -5, n // 2), rng.integers(-9, -5, n // 2) + rng.normal(0, 0.05, n // 2)])
+    lon = np.concatenate([rng.uniform(105, 113, n // 2), rng.integers(105, 113, n // 2) + rng.normal(0, 0.05, n // 2)])
+    nomor = np.arange(n).astype(str)
+    return pd.DataFrame({"Nama": nomor, "Alamat": nomor, "Wilayah": "Uji", "Latitude": lat, "Longitude": lon})
+
+
+def test_terdekat_sama_dengan_balltree_penuh(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = data_tersebar()
+    df.to_csv("tersebar.csv", index=False)
+    data = muat_ubin("tersebar.csv")
+    indeks = IndeksJarak(df["Latitude"], df["Longitude"])
+
+    rng = np.random.default_rng(1)
+    for lat, lon in zip(rng.uniform(-11, -3, 300), rng.uniform(103, 115, 300)):#termasuk titik di luar semua ubin
+        for k in (1, 3):
+            _, jarak = indeks.terdekat(lat, lon, k=k)
+            hasil = data.terdekat(lat, lon, k=k)
+            np.testing.assert_allclose(hasil["Jarak_KM"].to_numpy(), jarak, rtol=1e-9)
+
+
+def test_csv_tidak_dihash_ulang_kalau_tidak_berubah(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_tersebar(200).to_csv("kecil.csv", index=False)
+    versi = versi_file("kecil.csv")
+    dipanggil = []
+    monkeypatch.setattr(utils.dataset, "hash_file", lambda path: dipanggil.append(path))
+    assert versi_file("kecil.csv") == versi#proses baru: versi dibaca dari catatan, tidak membaca seluruh csv
+    assert not dipanggil
@@ -0,0 +1,230 @@
+#benchmark tahap-tahap utama aplikasi dengan data bengkel sintetis di kotak Jawa Tengah
+#cara pakai: python -m utils.benchmark [--ukuran 1000,10000,100000,1000000] [--output benchmark.json] [--bandingkan lama.json]
+#setiap tahap diukur terpisah, cara lama (apply, sort_values, groupby + iterrows, marker satu per satu) dan cara sekarang diukur berdampingan
+#hasilnya json supaya bisa dibandingkan antar versi: jalankan di commit lama dan baru lalu pakai --bandingkan
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.cakupan import batas_data, hitung_cakupan
+from utils.cleanReversData import bersihkan
+from utils.dataset import BATAS_JATENG, Dataset, baca_artefak, bangun_artefak
+from utils.jarak import IndeksJarak, haversine
+from utils.kepadatan import hitung_kepadatan
+from utils.peta import buat_peta_dasar
+from utils.statistik import hitung_statistik
+from utils.ukur_peta import peta_klasik, peta_cluster, ukur
+
+UKURAN_DEFAULT = [1_000, 10_000, 100_000, 1_000_000]
+USER_LAT, USER_LON = -6.99049680, 110.42294450#titik default aplikasi (Semarang)
+JUMLAH_PUSAT = 60#titik dibuat mengumpul di sekitar pusat-pusat kota seperti data asli, bukan seragam
+JUMLAH_WILAYAH = 35
+MAKS_APPLY = 100_000#df.apply per baris terlalu lambat untuk ukuran di atas ini
+MAKS_PETA_KLASIK = 10_000
+MAKS_PETA = 200_000#html peta di atas ukuran ini sudah ratusan MB
+
+
+def data_sintetis(n, seed=0):
+    #dataset bersih seperti bengkel_honda_jateng_final.csv
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = BATAS_JATENG
+    pusat = np.column_stack([rng.uniform(lat_min + 0.3, lat_max - 0.3, JUMLAH_PUSAT), rng.uniform(lon_min + 0.3, lon_max - 0.3, JUMLAH_PUSAT)])
+    pilih = rng.integers(0, JUMLAH_PUSAT, n)
+    lat = np.clip(pusat[pilih, 0] + rng.normal(0, 0.12, n), lat_min, lat_max).round(6)
+    lon = np.clip(pusat[pilih, 1] + rng.normal(0, 0.12, n), lon_min, lon_max).round(6)
+    nomor = np.arange(n).astype(str)
+    return pd.DataFrame({
+        "Nama": np.char.add("Bengkel Sintetis ", nomor),
+        "Alamat": np.char.add("Jl. Raya No. ", nomor),
+        "Wilayah": np.char.add("Kabupaten Sintetis ", (pilih % JUMLAH_WILAYAH).astype(str)),
+        "Latitude": lat,
+        "Longitude": lon,
+    })
+
+
+def data_mentah(df, seed=0):
+    #versi "hasil scrap" untuk mengukur pembersihan: wilayah lengkap, sebagian koordinat terbalik, duplikat dan baris kosong
+    rng = np.random.default_rng(seed + 1)
+    mentah = df.assign(Wilayah=", Kecamatan X, " + df["Wilayah"] + ", Jawa Tengah")
+    terbalik = rng.random(len(df)) < 0.02
+    mentah.loc[terbalik, ["Latitude", "Longitude"]] = mentah.loc[terbalik, ["Longitude", "Latitude"]].to_numpy()
+    mentah.loc[rng.random(len(df)) < 0.005, "Latitude"] = np.nan
+    duplikat = mentah.sample(frac=0.01, random_state=seed)
+    return pd.concat([mentah, duplikat], ignore_index=True)
+
+
+def heatmap_lama(df):
+    #cara Main.py versi awal: titik tengah tiap wilayah dengan groupby lalu list dibuat per baris dengan iterrows
+    df_kab = (
+        df.groupby("Wilayah")
+        .agg({"Latitude": "mean", "Longitude": "mean", "Nama": "count"})
+        .reset_index()
+        .rename(columns={"Nama": "Jumlah_Bengkel"})
+    )
+    return [[row["Latitude"], row["Longitude"], row["Jumlah_Bengkel"]] for _, row in df_kab.iterrows()]
+
+
+def bersihkan_koordinat(row):
+    #fungsi per baris dari cleanReversData.py versi awal
+    lat = row["Latitude"]
+    lon = row["Longitude"]
+    if pd.isna(lat) or pd.isna(lon):
+        return pd.Series([lat, lon])
+    if abs(lat) > 90:
+        return pd.Series([lon, lat])
+    return pd.Series([lat, lon])
+
+
+def pembersihan_lama(input_path, output_path):
+    #cleanReversData.py versi awal: baca sekaligus, bersihkan wilayah, tukar koordinat dengan df.apply per baris
+    df = pd.read_csv(input_path)
+    df["Wilayah"] = df["Wilayah"].str.lstrip(",").str.replace(", Jawa Tengah", "", case=False).str.strip()
+    df[["Latitude", "Longitude"]] = df.apply(bersihkan_koordinat, axis=1)
+    df.to_csv(output_path, index=False)
+
+
+def waktu(fungsi, ulang=1):
+    #waktu terbaik dari beberapa kali ulang (detik) dan hasil panggilan terakhir
+    terbaik = float("inf")
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        hasil = fungsi()
+        terbaik = min(terbaik, time.perf_counter() - t0)
+    return terbaik, hasil
+
+
+def benchmark_ukuran(n, folder, ulang=3):
+    tahap = {}
+
+    def catat(nama, fungsi, ulang=ulang, **info):
+        detik, hasil = waktu(fungsi, ulang)
+        tahap[nama] = {"detik": round(detik, 6), **info}
+        print(f"  {nama:28s} {detik * 1000:12.2f} ms")
+        return hasil
+
+    def lewati(nama, alasan):
+        tahap[nama] = {"detik": None, "dilewati": alasan}
+        print(f"  {nama:28s} {'dilewati':>15s} ({alasan})")
+
+    df_sintetis = data_sintetis(n)
+    path_csv = os.path.join(folder, f"bengkel_{n}.csv")
+    df_sintetis.to_csv(path_csv, index=False)
+    path_mentah = os.path.join(folder, f"mentah_{n}.csv")
+    data_mentah(df_sintetis).to_csv(path_mentah, index=False)
+    del df_sintetis
+
+    #muat data
+    df_csv = catat("csv_read_csv", lambda: pd.read_csv(path_csv), ulang=1, ukuran_csv_mb=round(os.path.getsize(path_csv) / 2**20, 2))
+    folder_artefak = os.path.join(folder, f"artefak_{n}")
+    catat("csv_bangun_artefak", lambda: bangun_artefak(path_csv, folder_artefak), ulang=1)
+    df = catat("csv_baca_artefak", lambda: baca_artefak(folder_artefak))
+
+    #jarak ke semua bengkel
+    if n <= MAKS_APPLY:
+        catat("jarak_apply", lambda: df_csv.apply(
+            lambda row: haversine(USER_LAT, USER_LON, row["Latitude"], row["Longitude"]), axis=1), ulang=1)
+    else:
+        lewati("jarak_apply", f"n > {MAKS_APPLY:,}")
+    lat, lon = df["Latitude"].to_numpy(), df["Longitude"].to_numpy()
+    jarak = catat("jarak_vektor", lambda: haversine(USER_LAT, USER_LON, lat, lon))
+    indeks = catat("indeks_bangun", lambda: IndeksJarak(lat, lon), ulang=1)
+
+    #3 terdekat
+    df_jarak = df_csv.assign(Jarak_KM=jarak)
+    catat("top3_sort_values", lambda: df_jarak.sort_values("Jarak_KM").head(3))
+    catat("top3_argpartition", lambda: np.argpartition(jarak, 3)[:3])
+    catat("top3_balltree", lambda: indeks.terdekat(USER_LAT, USER_LON, k=3))
+    del df_jarak
+
+    #agregasi wilayah
+    catat("wilayah_value_counts", lambda: df_csv["Wilayah"].value_counts())
+    cakupan = catat("cakupan_raster", lambda: hitung_cakupan(indeks, batas_data(lat, lon)), ulang=1)
+    catat("wilayah_statistik", lambda: hitung_statistik(df, cakupan))
+    dataset = Dataset(df, f"sintetis-{n}", folder_artefak, indeks=indeks, cakupan=cakupan)#pakai hasil yang sudah diukur, tidak dibuat ulang
+
+    #data heatmap
+    catat("heatmap_iterrows", lambda: heatmap_lama(df_csv))#iterrows hanya per wilayah, groupby yang sebanding jumlah baris
+    catat("heatmap_kepadatan", lambda: hitung_kepadatan(lat, lon))
+
+    #peta folium: waktu bangun, waktu serialisasi html dan ukuran html yang dikirim ke browser
+    posisi_terdekat, _ = indeks.terdekat(USER_LAT, USER_LON, k=3)
+    for nama, buat, maks in [("peta_klasik", peta_klasik, MAKS_PETA_KLASIK), ("peta_cluster", peta_cluster, MAKS_PETA)]:
+        if n > maks:
+            lewati(nama, f"n > {maks:,}")
+            continue
+        _, hasil = ukur(buat, df, jarak, posisi_terdekat, USER_LAT, USER_LON)
+        tahap[nama] = {"detik": round(hasil["bangun_s"] + hasil["render_s"], 6), **{k: round(v, 6) for k, v in hasil.items()}}
+        print(f"  {nama:28s} {tahap[nama]['detik'] * 1000:12.2f} ms  ({hasil['payload_kb']:,.0f} KB)")
+    if n <= MAKS_PETA:
+        html = catat("peta_dasar", lambda: buat_peta_dasar(dataset).get_root().render(), ulang=1)#termasuk grid kepadatan heatmap
+        tahap["peta_dasar"]["payload_kb"] = round(len(html.encode("utf-8")) / 1024, 1)
+    else:
+        lewati("peta_dasar", f"n > {MAKS_PETA:,}")
+
+    #pembersihan data hasil scrap
+    if n <= MAKS_APPLY:
+        catat("pembersihan_apply", lambda: pembersihan_lama(path_mentah, os.path.join(folder, f"bersih_lama_{n}.csv")), ulang=1)
+    else:
+        lewati("pembersihan_apply", f"n > {MAKS_APPLY:,}")
+    catat("pembersihan", lambda: bersihkan(
+        path_mentah, os.path.join(folder, f"bersih_{n}.csv"), os.path.join(folder, f"ditolak_{n}.csv")), ulang=1)
+    return tahap
+
+
+def versi_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bandingkan(lama, baru):
+    #rasio waktu baru / lama per ukuran dan tahap, < 1 berarti lebih cepat
+    hasil_lama = {h["n"]: h["tahap"] for h in lama["hasil"]}
+    print(f"\nPerbandingan dengan {lama.get('git') or '-'} (baru/lama):")
+    for h in baru["hasil"]:
+        for nama, info in h["tahap"].items():
+            sebelum = hasil_lama.get(h["n"], {}).get(nama, {}).get("detik")
+            if sebelum and info["detik"] is not None:
+                print(f"  n={h['n']:>9,} {nama:28s} {sebelum * 1000:10.2f} -> {info['detik'] * 1000:10.2f} ms  x{info['detik'] / sebelum:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tahap-tahap aplikasi dengan data bengkel sintetis")
+    parser.add_argument("--ukuran", default=",".join(str(n) for n in UKURAN_DEFAULT), help="jumlah bengkel, dipisah koma")
+    parser.add_argument("--ulang", type=int, default=3, help="tahap yang cepat diulang dan diambil waktu terbaik")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--bandingkan", help="file json hasil benchmark sebelumnya")
+    args = parser.parse_args()
+
+    hasil = {
+        "dibuat": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git": versi_git(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+        "hasil": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as folder:
+        for n in (int(x) for x in args.ukuran.split(",")):
+            print(f"n = {n:,}")
+            hasil["hasil"].append({"n": n, "tahap": benchmark_ukuran(n, folder, args.ulang)})
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(hasil, f, indent=1)
+    print(f"Hasil disimpan sebagai: {args.output}")
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            bandingkan(json.load(f), hasil)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import threading
+from collections import OrderedDict
+
+PRESISI_LOKASI_M = int(os.environ.get("PRESISI_LOKASI_M", 100))#lokasi pengguna dibulatkan ke grid sekitar 100 m untuk kunci cache
+METER_PER_DERAJAT = 111_320
+
+
+class CacheLRU:
+    #cache dengan batas jumlah entri, entri yang paling lama tidak dipakai dibuang duluan
+    #dipakai bersama semua sesi dalam satu proses, jadi dilindungi lock
+
+    def __init__(self, maks_entri):
+        self.maks_entri = maks_entri
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+
+    def ambil(self, kunci, buat):
+        #kembalikan nilai untuk kunci, kalau belum ada dibuat dengan memanggil buat()
+        with self._lock:
+            if kunci in self._data:
+                self._data.move_to_end(kunci)
+                self.hit += 1
+                return self._data[kunci]
+            self.miss += 1
+        nilai = buat()#dihitung di luar lock supaya sesi lain tidak ikut menunggu
+        with self._lock:
+            self._data[kunci] = nilai
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False)
+        return nilai
+
+    def __len__(self):
+        return len(self._data)
+
+
+def kunci_lokasi(lat, lon, presisi_m=PRESISI_LOKASI_M):
+    #bulatkan koordinat ke grid presisi_m meter, perubahan kecil (gps goyang) menghasilkan kunci yang sama
+    langkah = presisi_m / METER_PER_DERAJAT
+    return (int(round(lat / langkah)), int(round(lon / langkah)), presisi_m)
+
+
+def pusat_kunci(kunci):
+    #titik tengah sel grid dari kunci_lokasi, semua lokasi dengan kunci yang sama dihitung dari titik ini
+    i, j, presisi_m = kunci
+    langkah = presisi_m / METER_PER_DERAJAT
+    return i * langkah, j * langkah
@@ -0,0 +1,149 @@
+#raster jarak ke bengkel terdekat untuk setiap sel grid di seluruh wilayah data
+#bisa dijalankan sebagai batch job: python -m utils.cakupan --resolusi 0.002
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+RESOLUSI_DEFAULT = 0.005#ukuran sel dalam derajat (sekitar 550 m)
+UKURAN_CHUNK = 200_000#jumlah sel yang diproses sekaligus supaya memori tetap terbatas
+PADDING = 0.1#tambahan batas grid di sekeliling titik bengkel terluar (derajat)
+AMBANG_KM = 10
+
+
+def convex_hull(lat, lon):
+    #monotone chain, hasilnya titik sudut hull berlawanan arah jarum jam dalam bentuk (lon, lat)
+    titik = sorted(set(zip(np.asarray(lon).tolist(), np.asarray(lat).tolist())))
+    if len(titik) < 3:
+        return np.array(titik)
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    bawah, atas = [], []
+    for p in titik:
+        while len(bawah) >= 2 and cross(bawah[-2], bawah[-1], p) <= 0:
+            bawah.pop()
+        bawah.append(p)
+    for p in reversed(titik):
+        while len(atas) >= 2 and cross(atas[-2], atas[-1], p) <= 0:
+            atas.pop()
+        atas.append(p)
+    return np.array(bawah[:-1] + atas[:-1])
+
+
+def di_dalam_hull(hull, lat, lon):
+    #titik ada di dalam hull kalau berada di sisi kiri semua sisi hull (hull berlawanan arah jarum jam)
+    if len(hull) < 3:
+        return np.ones(len(lat), dtype=bool)
+    hasil = np.ones(len(lat), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(hull, np.roll(hull, -1, axis=0)):
+        hasil &= (x2 - x1) * (lat - y1) - (y2 - y1) * (lon - x1) >= 0
+    return hasil
+
+
+def batas_data(lat, lon, padding=PADDING):
+    return (
+        float(np.nanmin(lat)) - padding, float(np.nanmax(lat)) + padding,
+        float(np.nanmin(lon)) - padding, float(np.nanmax(lon)) + padding,
+    )
+
+
+def hitung_cakupan(indeks, batas, resolusi=RESOLUSI_DEFAULT, ukuran_chunk=UKURAN_CHUNK):
+    #hasil: dict berisi raster jarak (km, float32), posisi bengkel terdekat (int32) dan mask area layanan
+    #baris raster urut dari selatan ke utara, kolom dari barat ke timur
+    lat_min, lat_max, lon_min, lon_max = batas
+    n_baris = int(np.ceil((lat_max - lat_min) / resolusi))
+    n_kolom = int(np.ceil((lon_max - lon_min) / resolusi))
+    lat_grid = lat_min + (np.arange(n_baris) + 0.5) * resolusi#titik tengah sel
+    lon_grid = lon_min + (np.arange(n_kolom) + 0.5) * resolusi
+
+    hull = convex_hull(indeks.lat[indeks.posisi], indeks.lon[indeks.posisi])#area layanan didekati dengan convex hull semua bengkel
+    jarak = np.empty(n_baris * n_kolom, dtype=np.float32)
+    terdekat = np.empty(n_baris * n_kolom, dtype=np.int32)
+    mask = np.empty(n_baris * n_kolom, dtype=bool)
+    for awal in range(0, n_baris * n_kolom, ukuran_chunk):
+        sel = np.arange(awal, min(awal + ukuran_chunk, n_baris * n_kolom))
+        lat = lat_grid[sel // n_kolom]
+        lon = lon_grid[sel % n_kolom]
+        di_dalam = di_dalam_hull(hull, lat, lon)
+        mask[sel] = di_dalam
+        jarak[sel] = np.nan#sel di luar area layanan tidak dihitung
+        terdekat[sel] = -1
+        if di_dalam.any():
+            posisi, km = indeks.terdekat_banyak(lat[di_dalam], lon[di_dalam], k=1)
+            jarak[sel[di_dalam]] = km[:, 0]
+            terdekat[sel[di_dalam]] = posisi[:, 0]
+
+    return {
+        "jarak": jarak.reshape(n_baris, n_kolom),
+        "terdekat": terdekat.reshape(n_baris, n_kolom),
+        "mask": mask.reshape(n_baris, n_kolom),
+        "batas": np.array(batas),
+        "resolusi": np.array(resolusi),
+    }
+
+
+def luas_sel(hasil):
+    #luas tiap sel dalam km2, sel makin kecil kalau makin jauh dari khatulistiwa
+    lat_min = hasil["batas"][0]
+    resolusi = float(hasil["resolusi"])
+    n_baris, n_kolom = hasil["jarak"].shape
+    lat = lat_min + (np.arange(n_baris) + 0.5) * resolusi
+    km_per_derajat = 111.32
+    luas_baris = (resolusi * km_per_derajat) ** 2 * np.cos(np.radians(lat))
+    return np.broadcast_to(luas_baris[:, None], (n_baris, n_kolom))
+
+
+def ringkasan_cakupan(hasil, ambang_km=AMBANG_KM):
+    mask = hasil["mask"]
+    luas = luas_sel(hasil)[mask]
+    jarak = hasil["jarak"][mask]
+    if luas.sum() == 0:
+        return {"persen_jauh": 0.0, "luas_jauh_km2": 0.0, "jarak_rata": 0.0, "jarak_maks": 0.0}
+    jauh = jarak > ambang_km
+    return {
+        "persen_jauh": float(luas[jauh].sum() / luas.sum() * 100),#persentase luas area yang jaraknya lebih dari ambang
+        "luas_jauh_km2": float(luas[jauh].sum()),
+        "jarak_rata": float(np.average(jarak, weights=luas)),
+        "jarak_maks": float(jarak.max()),
+    }
+
+
+def muat_cakupan(folder, indeks, resolusi=RESOLUSI_DEFAULT):
+    #raster disimpan di folder artefak dataset, hanya dihitung ulang kalau dataset atau resolusinya berubah
+    path = os.path.join(folder, f"cakupan-{resolusi}.npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return {kunci: data[kunci] for kunci in data.files}
+
+    hasil = hitung_cakupan(indeks, batas_data(indeks.lat, indeks.lon), resolusi)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}.npz"#nama unik per thread, sesi streamlit berbagi satu proses
+    np.savez_compressed(tmp, **hasil)
+    os.replace(tmp, path)
+    return hasil
+
+
+def main():
+    from utils.dataset import muat_dataset
+
+    parser = argparse.ArgumentParser(description="Hitung raster jarak ke bengkel terdekat")
+    parser.add_argument("--csv", default="data/bengkel_honda_jateng_final.csv")
+    parser.add_argument("--resolusi", type=float, default=RESOLUSI_DEFAULT, help="ukuran sel grid dalam derajat")
+    parser.add_argument("--ambang", type=float, default=AMBANG_KM, help="ambang jarak (km) untuk ringkasan")
+    args = parser.parse_args()
+
+    dataset = muat_dataset(args.csv)
+    t0 = time.perf_counter()
+    hasil = muat_cakupan(dataset.folder, dataset.indeks, args.resolusi)
+    n_baris, n_kolom = hasil["jarak"].shape
+    print(f"Grid {n_baris} x {n_kolom} = {n_baris * n_kolom:,} sel selesai dalam {time.perf_counter() - t0:.2f} detik")
+    ringkasan = ringkasan_cakupan(hasil, args.ambang)
+    print(f"Area lebih dari {args.ambang:g} KM dari bengkel: {ringkasan['persen_jauh']:.1f}% ({ringkasan['luas_jauh_km2']:,.0f} km2)")
+    print(f"Jarak rata-rata: {ringkasan['jarak_rata']:.2f} KM, terjauh: {ringkasan['jarak_maks']:.2f} KM")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,155 @@
+#pembersihan data hasil scrap menjadi dataset yang dibaca Main.py
+#cara pakai: python -m utils.cleanReversData [--input data/bengkel_honda_jateng.csv] [--chunksize 100000]
+#data dibaca per potongan (chunk) supaya file hasil scrap skala nasional tidak perlu muat di memori sekaligus
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
 
-file_path = "data/bengkel_honda_jateng.csv"
-try:
-    df = pd.read_csv(file_path)
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding='latin1')
+from utils.dataset import BATAS_JATENG
+
+INPUT = os.path.join("data", "bengkel_honda_jateng.csv")
+OUTPUT = os.path.join("data", "bengkel_honda_jateng_final.csv")#file yang dibaca Main.py
+DITOLAK = os.path.join("data", "bengkel_ditolak.csv")#laporan baris yang dibuang beserta alasannya
+KOLOM = ["Nama", "Alamat", "Wilayah", "Latitude", "Longitude"]
+UKURAN_SEL_DUPLIKAT = 0.001#sekitar 110 m, bengkel dengan nama sama di sel yang sama/bersebelahan dianggap duplikat
+UKURAN_CHUNK = 100_000
+
+
+def baca_csv(path, chunksize):
+    try:
+        return pd.read_csv(path, chunksize=chunksize, dtype={"Nama": str, "Alamat": str, "Wilayah": str})
+    except UnicodeDecodeError:
+        return pd.read_csv(path, chunksize=chunksize, dtype={"Nama": str, "Alamat": str, "Wilayah": str}, encoding="latin1")
 
-print("--- Memulai Proses Pembersihan Data ---")
 
-if 'Wilayah' in df.columns:#cek apakah kolom wilayah ada atau tidak
-    print("Sedang membersihkan teks pada kolom Wilayah...")
-    df['Wilayah'] = df['Wilayah'].str.lstrip(',').str.replace(', Jawa Tengah', '', case=False).str.strip()
+def normalisasi_wilayah(wilayah):
+    #"Kramatsari, Kota Pekalongan, Jawa Tengah" -> "Kota Pekalongan"
+    w = wilayah.fillna("").str.lstrip(",").str.replace(", Jawa Tengah", "", case=False).str.strip()
     #lstrip untuk menghapus koma di awal, replace untuk menghapus ', Jawa Tengah' dan strip untuk menghapus spasi di awal dan akhir
-else:
-    print("Peringatan: Kolom 'Wilayah' tidak ditemukan!")
-
-def bersihkan_koordinat(row):
-    lat = row['Latitude']
-    lon = row['Longitude']
-    
-    if pd.isna(lat) or pd.isna(lon):
-        return pd.Series([lat, lon])
-
-    if abs(lat) > 90:#kalo nilai mutlak lat lebih besar dari 90 maka kemungkinan terbalik maka di balioakn
-        actual_lat = lon
-        actual_lon = lat
-    else:
-        actual_lat = lat
-        actual_lon = lon
-        
-    return pd.Series([actual_lat, actual_lon])#untuk membersihkan koordinat yang terbalik dengan memeriksa nilai mutlak latitude, jika lebih besar dari 90 maka dianggap terbalik dan ditukar
-
-print("Sedang memperbaiki koordinat yang terbalik secara otomatis...")
-df[['Latitude', 'Longitude']] = df.apply(lambda row: bersihkan_koordinat(row), axis=1)
-#menerapkan fungsi bersih untuk ke steiap baris di dataset
-
-output_file = "bengkel_honda_jateng_bersih_final.csv"
-df.to_csv(output_file, index=False)
-
-print("-" * 50)
-print(f"Selesai! File bersih disimpan sebagai: {output_file}")
-print(f"Total data diproses: {len(df)}")
\ No newline at end of file
+    w = w.str.replace(r"\s+", " ", regex=True)
+    kab_kota = w.str.extract(r"((?:Kabupaten|Kota|KABUPATEN|KOTA|Kab\.|Kab) [^,]+)\s*$")[0]#ambil bagian kabupaten/kota paling belakang
+    kab_kota = (
+        kab_kota.str.replace(r"^(?:KABUPATEN|Kab\.?)\s", "Kabupaten ", regex=True)
+        .str.replace(r"^KOTA\s", "Kota ", regex=True)
+        .str.title()
+    )
+    return kab_kota.fillna(w)#kalau tidak ada kata kabupaten/kota, pakai teks yang sudah dibersihkan
+
+
+def perbaiki_koordinat(lat, lon):
+    #kalo nilai mutlak lat lebih besar dari 90 maka kemungkinan terbalik maka di balikkan, dikerjakan untuk semua baris sekaligus
+    terbalik = np.abs(lat) > 90
+    return np.where(terbalik, lon, lat), np.where(terbalik, lat, lon), terbalik
+
+
+def di_dalam_batas(lat, lon, batas=BATAS_JATENG):
+    lat_min, lat_max, lon_min, lon_max = batas
+    return (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+
+
+def hash_duplikat(nama, lat, lon):
+    #hash (nama, sel grid) untuk sel sendiri dan 8 sel tetangga, bentuk (n, 9)
+    kunci_nama = nama.str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    h_nama = pd.util.hash_array(kunci_nama.to_numpy(dtype=object))
+    i = np.floor(lat / UKURAN_SEL_DUPLIKAT).astype(np.int64)
+    j = np.floor(lon / UKURAN_SEL_DUPLIKAT).astype(np.int64)
+    geser = np.array([(di, dj) for di in (0, -1, 1) for dj in (0, -1, 1)])#kolom 0 = sel sendiri
+    ii = (i[:, None] + geser[:, 0]).astype(np.uint64)
+    jj = (j[:, None] + geser[:, 1]).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return h_nama[:, None] ^ (ii * np.uint64(0x9E3779B97F4A7C15)) ^ (jj * np.uint64(0xC2B2AE3D27D4EB4F))
+
+
+def tandai_duplikat(h, sudah_ada):
+    #duplikat kalau salah satu sel tetangga sudah dipakai bengkel bernama sama di baris valid yang lebih awal,
+    #baik di chunk sebelumnya maupun di chunk yang sama. Baris yang ditolak sebagai duplikat tetap dihitung
+    #(rantai a-b-c berjarak 110 m hanya menyisakan a), aturan yang sama di dalam dan antar chunk
+    #supaya hasilnya tidak tergantung ukuran chunk
+    dari_sebelumnya = np.isin(h, sudah_ada).any(axis=1)
+    sendiri, pertama = np.unique(h[:, 0], return_index=True)
+    pos = np.clip(np.searchsorted(sendiri, h), 0, len(sendiri) - 1)
+    cocok = sendiri[pos] == h
+    baris = np.arange(len(h))[:, None]
+    dalam_chunk = (cocok & (pertama[pos] < baris)).any(axis=1)
+    return dari_sebelumnya | dalam_chunk
+
+
+def bersihkan_chunk(df, sudah_ada):
+    df = df.reindex(columns=KOLOM)
+    df["Wilayah"] = normalisasi_wilayah(df["Wilayah"])
+    df["Nama"] = df["Nama"].fillna("").str.strip()
+    df["Alamat"] = df["Alamat"].fillna("").str.strip()
+
+    lat = pd.to_numeric(df["Latitude"], errors="coerce").to_numpy(np.float64)
+    lon = pd.to_numeric(df["Longitude"], errors="coerce").to_numpy(np.float64)
+    lat, lon, terbalik = perbaiki_koordinat(lat, lon)
+    df["Latitude"] = lat
+    df["Longitude"] = lon
+
+    alasan = np.full(len(df), "", dtype=object)
+    kosong = np.isnan(lat) | np.isnan(lon) | (df["Nama"] == "").to_numpy()
+    alasan[kosong] = "data_kosong"
+    luar = ~kosong & ~di_dalam_batas(lat, lon)
+    alasan[luar] = "di_luar_batas"
+
+    valid = alasan == ""
+    h = hash_duplikat(df["Nama"][valid], lat[valid], lon[valid])
+    duplikat = tandai_duplikat(h, sudah_ada)
+    idx_valid = np.flatnonzero(valid)
+    alasan[idx_valid[duplikat]] = "duplikat"
+    diterima = alasan == ""
+
+    sudah_ada = np.union1d(sudah_ada, h[:, 0])#cukup simpan hash sel sendiri semua baris valid, bukan seluruh data
+    return df[diterima], df[~diterima].assign(Alasan=alasan[~diterima]), int(terbalik.sum()), sudah_ada
+
+
+def tulis(df, path, pertama):
+    df.to_csv(path, mode="w" if pertama else "a", header=pertama, index=False)
+
+
+def bersihkan(input_path, output_path, ditolak_path, chunksize=UKURAN_CHUNK):
+    tmp_output = f"{output_path}.tmp"
+    tmp_ditolak = f"{ditolak_path}.tmp"
+    sudah_ada = np.empty(0, dtype=np.uint64)
+    total = {"dibaca": 0, "diterima": 0, "ditolak": 0, "dibalik": 0}
+    pertama = True
+    for chunk in baca_csv(input_path, chunksize):
+        diterima, ditolak, dibalik, sudah_ada = bersihkan_chunk(chunk, sudah_ada)
+        tulis(diterima, tmp_output, pertama)
+        tulis(ditolak, tmp_ditolak, pertama)
+        pertama = False
+        total["dibaca"] += len(chunk)
+        total["diterima"] += len(diterima)
+        total["ditolak"] += len(ditolak)
+        total["dibalik"] += dibalik
+        print(f"Diproses {total['dibaca']:,} baris...")
+
+    if pertama:#file input kosong
+        tulis(pd.DataFrame(columns=KOLOM), tmp_output, True)
+        tulis(pd.DataFrame(columns=KOLOM + ["Alasan"]), tmp_ditolak, True)
+    os.replace(tmp_output, output_path)#file lama baru diganti setelah semua chunk selesai
+    os.replace(tmp_ditolak, ditolak_path)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bersihkan data bengkel hasil scrap")
+    parser.add_argument("--input", default=INPUT)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--ditolak", default=DITOLAK)
+    parser.add_argument("--chunksize", type=int, default=UKURAN_CHUNK)
+    args = parser.parse_args()
+
+    print("--- Memulai Proses Pembersihan Data ---")
+    total = bersihkan(args.input, args.output, args.ditolak, args.chunksize)
+    print("-" * 50)
+    print(f"Selesai! File bersih disimpan sebagai: {args.output}")
+    print(f"Total data diproses: {total['dibaca']}")
+    print(f"Koordinat terbalik yang diperbaiki: {total['dibalik']}")
+    print(f"Diterima: {total['diterima']}, ditolak: {total['ditolak']} (lihat {args.ditolak})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.cakupan import muat_cakupan
+from utils.jarak import IndeksJarak
+from utils.kepadatan import muat_kepadatan
+from utils.statistik import muat_statistik
+
+FOLDER_CACHE = os.path.join("data", "cache")#tempat artefak biner hasil konversi csv
+KOLOM_KOORDINAT = ["Latitude", "Longitude"]
+KOLOM_TEKS = ["Nama", "Alamat", "Wilayah"]
+BATAS_JATENG = (-8.4, -5.7, 108.3, 111.9)#lat_min, lat_max, lon_min, lon_max termasuk Karimunjawa
+
+_lock = threading.Lock()
+_cache = {}#cache satu proses: (path sumber, akhiran) -> (mtime, ukuran, hasil), dipakai bersama oleh semua sesi
+
+
+def _sekali(fungsi):
+    #seperti functools.cached_property, tapi kalau beberapa sesi (thread) memintanya bersamaan hanya satu yang menghitung,
+    #yang lain menunggu hasilnya. Satu lock per nilai, jadi membangun raster cakupan tidak menahan pembacaan kepadatan
+    nama = fungsi.__name__
+
+    @functools.wraps(fungsi)
+    def ambil(self):
+        try:
+            return self.__dict__[nama]
+        except KeyError:
+            pass
+        with self._lock[nama]:
+            if nama not in self.__dict__:
+                self.__dict__[nama] = fungsi(self)
+            return self.__dict__[nama]
+    return property(ambil)
+
+
+class Dataset:
+    #satu versi dataset bengkel yang sudah dimuat, dipakai bersama (read only) oleh semua sesi
+    #versi = hash isi csv, folder = lokasi artefak biner untuk versi ini
+    #indeks, kepadatan dan cakupan bisa diberikan langsung kalau sudah tersedia (misal gabungan grid per ubin),
+    #selain itu dibuat atau dibaca dari folder saat pertama kali dipakai
+
+    def __init__(self, df, versi, folder, indeks=None, kepadatan=None, cakupan=None):
+        self.df = df
+        self.versi = versi
+        self.folder = folder
+        self._lock = {nama: threading.Lock() for nama in ("indeks", "kepadatan", "cakupan", "statistik")}
+        for nama, nilai in (("indeks", indeks), ("kepadatan", kepadatan), ("cakupan", cakupan)):
+            if nilai is not None:
+                self.__dict__[nama] = nilai#nilai yang sudah ada dipakai langsung, tidak dihitung ulang
+
+    @_sekali
+    def indeks(self):
+        return IndeksJarak(self.df["Latitude"], self.df["Longitude"])#indeks spasial dibuat sekali per versi dataset
+
+    @_sekali
+    def kepadatan(self):
+        return muat_kepadatan(self.folder, self.df["Latitude"], self.df["Longitude"])#grid kepadatan per level zoom
+
+    @_sekali
+    def cakupan(self):
+        return muat_cakupan(self.folder, self.indeks)#raster jarak ke bengkel terdekat untuk seluruh wilayah
+
+    @_sekali
+    def statistik(self):
+        return muat_statistik(self.folder, self.df, self.cakupan)#agregat per wilayah yang tidak tergantung lokasi pengguna
+
+
+def hash_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):#baca per 1 MB supaya file besar tidak masuk memori sekaligus
+            h.update(blok)
+    return h.hexdigest()[:16]
+
+
+def versi_file(path):
+    #hash isi file, dicatat bersama mtime dan ukurannya di data/cache/<nama>-<hash path>.versi.json
+    #proses baru cukup membaca catatan ini, file hanya di-hash ulang kalau mtime atau ukurannya berubah
+    stat = os.stat(path)
+    nama = os.path.splitext(os.path.basename(path))[0]
+    kunci = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    path_catatan = os.path.join(FOLDER_CACHE, f"{nama}-{kunci}.versi.json")
+    try:
+        with open(path_catatan, encoding="utf-8") as f:
+            catatan = json.load(f)
+        if catatan["mtime_ns"] == stat.st_mtime_ns and catatan["ukuran"] == stat.st_size:
+            return catatan["versi"]
+    except (OSError, ValueError, KeyError):
+        pass#belum ada atau rusak, hash ulang
+
+    versi = hash_file(path)
+    os.makedirs(FOLDER_CACHE, exist_ok=True)
+    tmp = f"{path_catatan}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"mtime_ns": stat.st_mtime_ns, "ukuran": stat.st_size, "versi": versi}, f)
+    os.replace(tmp, path_catatan)
+    return versi
+
+
+def bangun_artefak(csv_path, folder):
+    #konversi csv menjadi folder berisi array .npy per kolom:
+    #koordinat sebagai float64, kolom teks sebagai kode kategori int32 + daftar kategori di meta.json
+    df = pd.read_csv(csv_path)
+    tmp = f"{folder}.tmp-{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+
+    meta = {"sumber": os.path.basename(csv_path), "jumlah_baris": len(df), "kategori": {}}
+    for kolom in KOLOM_KOORDINAT:
+        np.save(os.path.join(tmp, f"{kolom}.npy"), pd.to_numeric(df[kolom], errors="coerce").to_numpy(np.float64))
+    for kolom in KOLOM_TEKS:
+        kat = pd.Categorical(df[kolom])
+        np.save(os.path.join(tmp, f"{kolom}.npy"), kat.codes.astype(np.int32))
+        meta["kategori"][kolom] = [str(k) for k in kat.categories]
+
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    try:
+        os.replace(tmp, folder)#ganti nama secara atomik supaya proses lain tidak membaca artefak setengah jadi
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)#sudah dibuat proses lain duluan
+
+
+def baca_artefak(folder):
+    with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    kolom = {}
+    for nama in KOLOM_KOORDINAT:
+        kolom[nama] = np.load(os.path.join(folder, f"{nama}.npy"), mmap_mode="r")#memory map, tidak disalin ke memori sampai dibaca
+    for nama in KOLOM_TEKS:
+        codes = np.load(os.path.join(folder, f"{nama}.npy"), mmap_mode="r")
+        kolom[nama] = pd.Categorical.from_codes(codes, categories=meta["kategori"][nama])
+
+    return pd.DataFrame(kolom, columns=KOLOM_TEKS + KOLOM_KOORDINAT, copy=False)
+
+
+def muat_artefak(path, akhiran, penanda, bangun, buka):
+    #pola bersama untuk file sumber yang diproses sekali menjadi artefak di data/cache/<nama>-<versi><akhiran>:
+    #bangun(path, folder) dipanggil kalau file penanda di folder belum ada, buka(folder, versi) membuat objek hasilnya
+    #hasil di cache per proses dan dipakai ulang selama mtime dan ukuran file sumber tidak berubah
+    stat = os.stat(path)
+    kunci = (os.path.abspath(path), akhiran)
+    tersimpan = _cache.get(kunci)
+    if tersimpan and tersimpan[0] == stat.st_mtime_ns and tersimpan[1] == stat.st_size:
+        return tersimpan[2]#sumber belum berubah, tidak perlu menunggu lock yang mungkin sedang dipakai membangun artefak lain
+    with _lock:
+        tersimpan = _cache.get(kunci)
+        if tersimpan and tersimpan[0] == stat.st_mtime_ns and tersimpan[1] == stat.st_size:
+            return tersimpan[2]
+
+        versi = versi_file(path)#tidak di-hash ulang setiap proses baru start, hanya kalau berubah
+        nama = os.path.splitext(os.path.basename(path))[0]
+        folder = os.path.join(FOLDER_CACHE, f"{nama}-{versi}{akhiran}")
+        if not os.path.exists(os.path.join(folder, penanda)):
+            os.makedirs(FOLDER_CACHE, exist_ok=True)
+            bangun(path, folder)
+
+        hasil = buka(folder, versi)
+        _cache[kunci] = (stat.st_mtime_ns, stat.st_size, hasil)
+        return hasil
+
+
+def muat_dataset(csv_path):
+    #muat dataset dari artefak biner, artefak dibangun ulang otomatis kalau isi csv berubah
+    return muat_artefak(csv_path, "", "meta.json", bangun_artefak, lambda folder, versi: Dataset(baca_artefak(folder), versi, folder))
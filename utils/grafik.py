@@ -0,0 +1,50 @@
+#grafik matplotlib untuk bagian statistik, dirender ke png lalu figure langsung dilepas
+#memakai Figure langsung (bukan pyplot) supaya tidak ada figure yang tertinggal di memori dan aman dipakai banyak sesi
+import io
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from utils.cache import CacheLRU
+
+cache_grafik = CacheLRU(maks_entri=256)#kunci: (jenis grafik, versi dataset, lokasi yang sudah dibulatkan)
+
+
+def ke_png(fig):
+    FigureCanvasAgg(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    fig.clear()#lepas semua artist supaya memori figure langsung bisa dibebaskan
+    return buf.getvalue()
+
+
+def grafik_gap(data_kab_bottom):
+    fig = Figure(figsize=(10, 6.5))#ukuran lebih besar agar lebih jelas
+    ax_gap = fig.subplots()
+    bars = ax_gap.barh(data_kab_bottom.index, data_kab_bottom.values, color='orange')
+    ax_gap.bar_label(bars, padding=3)
+    ax_gap.set_xlabel("Jumlah Bengkel Resmi")
+    ax_gap.set_title("Wilayah dengan Cakupan Layanan Terendah")
+    return ke_png(fig)
+
+
+def grafik_histogram(jarak):
+    fig = Figure()
+    ax_dist = fig.subplots()
+    ax_dist.hist(jarak, bins=20, color='skyblue', edgecolor='black')#distribusi jarak bengkel dengan 20 bin, warna biru muda, dan garis tepi hitam untuk membedakan setiap bar
+    ax_dist.set_xlabel("Jarak (KM)")
+    ax_dist.set_ylabel("Frekuensi")
+    return ke_png(fig)
+
+
+def grafik_boxplot(jarak):
+    fig = Figure(figsize=(10, 3))
+    ax_box = fig.subplots()
+    ax_box.boxplot(jarak, vert=False, patch_artist=True,
+                   boxprops=dict(facecolor='lightgreen'))#sebaran jarak bengkel, orientasi horizontal, kotak hijau muda dengan garis median di dalamnya
+    ax_box.set_xlabel("Jarak (KM)")
+    return ke_png(fig)
+
+
+def render(jenis, kunci, buat):
+    return cache_grafik.ambil((jenis,) + tuple(kunci), buat)
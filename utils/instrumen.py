@@ -0,0 +1,117 @@
+#pengukuran waktu dan memori per tahap untuk setiap rerun streamlit
+#aktif kalau sesi menyalakan panel debug di sidebar, atau untuk semua sesi dengan environment variable INSTRUMEN=1
+#hasil tiap rerun ditulis satu baris json ke data/log/instrumen.jsonl (dirotasi per 5 MB)
+#kalau tidak aktif, tahap() hanya mengembalikan context kosong yang sama jadi hampir tanpa biaya
+#secara default hanya waktu yang diukur. Memori (tracemalloc) harus dinyalakan terpisah dengan INSTRUMEN_MEMORI=1,
+#karena tracemalloc berlaku untuk seluruh proses: selama menyala, alokasi semua sesi lain ikut dilacak dan melambat
+#(render grafik bisa beberapa kali lebih lambat), jadi pakai hanya saat mengukur dengan sedikit sesi
+#tracemalloc hanya jalan di dalam tahap yang sedang diukur dan dimatikan di blok finally tahap itu,
+#jadi rerun yang gagal, dihentikan (st.rerun) atau sesi yang ditinggalkan tidak membuatnya tetap menyala
+import contextlib
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+
+INSTRUMEN_SEMUA = os.environ.get("INSTRUMEN") == "1"
+INSTRUMEN_MEMORI = os.environ.get("INSTRUMEN_MEMORI") == "1"
+FILE_LOG = os.path.join("data", "log", "instrumen.jsonl")
+UKURAN_LOG = 5 * 2**20
+JUMLAH_CADANGAN_LOG = 3
+
+_KOSONG = contextlib.nullcontext()
+_lock = threading.Lock()
+_tahap_aktif = []#tahap yang sedang diukur di semua sesi, tracemalloc jalan selama daftar ini tidak kosong
+
+
+def _logger():
+    logger = logging.getLogger("instrumen")
+    with _lock:
+        if not logger.handlers:
+            os.makedirs(os.path.dirname(FILE_LOG), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                FILE_LOG, maxBytes=UKURAN_LOG, backupCount=JUMLAH_CADANGAN_LOG, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def _catat_puncak():
+    #puncak tracemalloc berlaku untuk seluruh proses dan direset setiap tahap dimulai,
+    #jadi puncak sejauh ini disimpan dulu ke semua tahap yang sedang berjalan (termasuk tahap luar yang bersarang)
+    _, puncak = tracemalloc.get_traced_memory()
+    for t in _tahap_aktif:
+        t["puncak"] = max(t["puncak"], puncak)
+
+
+class Pengukur:
+    #satu objek per rerun, tahap dicatat berurutan: (nama, milidetik, kenaikan puncak memori dalam KB)
+    #memori None kalau tidak diukur, atau kalau tahap berjalan bersamaan dengan tahap sesi lain
+    #karena tracemalloc tidak bisa memisahkan alokasinya
+
+    def __init__(self, aktif, sesi, memori=INSTRUMEN_MEMORI):
+        self.aktif = aktif
+        self.memori = aktif and memori
+        self.sesi = sesi
+        self.tahap_selesai = []
+        self._mulai = time.perf_counter()
+
+    def tahap(self, nama):
+        return self._ukur(nama) if self.aktif else _KOSONG
+
+    @contextlib.contextmanager
+    def _ukur(self, nama):
+        catatan = self._mulai_memori() if self.memori else None
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            kb = self._selesai_memori(catatan) if catatan is not None else None
+            self.tahap_selesai.append((nama, ms, kb))
+
+    def _mulai_memori(self):
+        with _lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _catat_puncak()
+            campur = any(t["sesi"] != self.sesi for t in _tahap_aktif)
+            for t in _tahap_aktif:
+                if t["sesi"] != self.sesi:
+                    t["campur"] = True
+            sekarang, _ = tracemalloc.get_traced_memory()
+            catatan = {"sesi": self.sesi, "awal": sekarang, "puncak": sekarang, "campur": campur}
+            _tahap_aktif.append(catatan)
+            tracemalloc.reset_peak()
+        return catatan
+
+    def _selesai_memori(self, catatan):
+        with _lock:
+            _catat_puncak()
+            _tahap_aktif.remove(catatan)
+            if not _tahap_aktif:
+                tracemalloc.stop()
+        return None if catatan["campur"] else max(catatan["puncak"] - catatan["awal"], 0) / 1024
+
+    def selesai(self, versi=None):
+        #tulis hasil rerun ke log, dipanggil sekali di akhir script
+        if not self.aktif:
+            return
+        self.total_ms = (time.perf_counter() - self._mulai) * 1000
+        _logger().info(json.dumps({
+            "waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "sesi": self.sesi,
+            "versi": versi,
+            "total_ms": round(self.total_ms, 2),
+            "memori_diukur": self.memori,
+            "tahap": [
+                {"nama": n, "ms": round(ms, 2), "memori_kb": None if kb is None else round(kb, 1)}
+                for n, ms, kb in self.tahap_selesai
+            ],
+        }, ensure_ascii=False))
@@ -0,0 +1,209 @@
+#mode jarak jalan raya tanpa internet: graf jaringan jalan dari file GeoJSON lokal (LineString/MultiLineString,
+#misal hasil ekspor OpenStreetMap dengan osmium/ogr2ogr), diproses sekali lalu disimpan sebagai array CSR di data/cache
+#persiapan graf: python -m utils.jalan data/jalan_jateng.geojson
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from sklearn.neighbors import BallTree
+
+from utils.dataset import muat_artefak, muat_dataset
+from utils.jarak import R_BUMI, haversine
+
+FILE_JALAN = os.path.join("data", "jalan_jateng.geojson")#mode jalan raya hanya muncul kalau file ini ada
+NAMA_FILE = "graf.npz"
+PRESISI_SIMPUL = 1e-6#titik dengan koordinat sama sampai 6 angka desimal dianggap simpul yang sama (persimpangan)
+KANDIDAT = 10#jumlah bengkel terdekat (garis lurus) yang diurutkan ulang dengan jarak jalan
+FAKTOR_BATAS = 3.0#pencarian jalur berhenti di 3x jarak garis lurus kandidat terjauh
+BATAS_MAKS_KM = 75.0#batas atas pencarian supaya query tetap cepat, bengkel yang lebih jauh dianggap tidak terjangkau
+TEMPEL_MAKS_KM = 2.0#titik yang lebih jauh dari ini ke simpul terdekat dianggap di luar cakupan jaringan jalan
+
+class GrafJalan:
+    #graf berarah dalam bentuk CSR (indptr, indices, bobot km) + koordinat simpul
+    #titik sembarang (pengguna, bengkel) ditempelkan ke simpul terdekat lewat BallTree
+
+    def __init__(self, indptr, indices, bobot, lat, lon, versi=None):
+        n = len(lat)
+        self.versi = versi#hash file jaringan jalan, dipakai sebagai bagian kunci cache hasil
+        self.csr = csr_matrix((bobot, indices, indptr), shape=(n, n))
+        self.lat = lat
+        self.lon = lon
+        self.tree = BallTree(np.radians(np.column_stack([lat, lon])), metric="haversine")
+
+    def __len__(self):
+        return len(self.lat)
+
+    def simpul_terdekat(self, lat, lon):
+        #mengembalikan (simpul, jarak_km) untuk setiap titik
+        titik = np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)]))
+        jarak, idx = self.tree.query(titik, k=1)
+        return idx[:, 0], jarak[:, 0] * R_BUMI
+
+    def jarak_jalan(self, lat, lon, tujuan_lat, tujuan_lon, batas_km=np.inf):
+        #jarak jalan (km) dari satu titik asal ke banyak titik tujuan, satu kali dijkstra dari titik asal
+        #tujuan yang lebih jauh dari batas_km, tidak terhubung, atau di luar cakupan jaringan jalan bernilai inf
+        #(pemanggil kembali ke jarak garis lurus), jarak tempel asal ikut dihitung dalam batas_km
+        asal, tempel_asal = self.simpul_terdekat(lat, lon)
+        tujuan, tempel_tujuan = self.simpul_terdekat(tujuan_lat, tujuan_lon)
+        tempel_asal = float(tempel_asal[0])
+        if tempel_asal > TEMPEL_MAKS_KM or tempel_asal >= batas_km:
+            return np.full(len(tujuan), np.inf)
+        jarak = dijkstra(self.csr, directed=True, indices=int(asal[0]), limit=batas_km - tempel_asal)
+        jarak = tempel_asal + jarak[tujuan] + tempel_tujuan
+        jarak[tempel_tujuan > TEMPEL_MAKS_KM] = np.inf
+        return jarak
+
+
+def baca_geojson(path):
+    #semua garis jalan sebagai list array (m, 2) berisi (lat, lon), plus arah satu jalur per garis
+    #oneway: 1 = searah garis, -1 = berlawanan arah garis, 0 = dua arah
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    fitur = data["features"] if data.get("type") == "FeatureCollection" else [data]
+
+    garis, arah = [], []
+    for ft in fitur:
+        geom = ft.get("geometry") or {}
+        if geom.get("type") == "LineString":
+            bagian = [geom["coordinates"]]
+        elif geom.get("type") == "MultiLineString":
+            bagian = geom["coordinates"]
+        else:
+            continue
+        oneway = str((ft.get("properties") or {}).get("oneway", "")).lower()
+        a = 1 if oneway in ("yes", "true", "1") else -1 if oneway == "-1" else 0
+        for koordinat in bagian:
+            if len(koordinat) >= 2:
+                koordinat = np.asarray(koordinat, dtype=np.float64)[:, :2]
+                garis.append(koordinat[:, ::-1])#geojson menyimpan (lon, lat)
+                arah.append(a)
+    return garis, np.array(arah, dtype=np.int8)
+
+
+def bangun_graf(garis, arah):
+    #simpul = titik unik setelah dibulatkan, sisi = setiap ruas di antara dua titik berurutan dalam satu garis
+    panjang = np.array([len(g) for g in garis])
+    titik = np.concatenate(garis)
+    kunci = np.round(titik / PRESISI_SIMPUL).astype(np.int64)
+    kunci = (kunci[:, 0] + 90_000_000) * 360_000_001 + (kunci[:, 1] + 180_000_000)#gabung lat dan lon jadi satu bilangan
+    _, pertama, simpul = np.unique(kunci, return_index=True, return_inverse=True)
+    lat, lon = titik[pertama, 0], titik[pertama, 1]
+
+    akhir_garis = np.cumsum(panjang) - 1
+    awal_ruas = np.setdiff1d(np.arange(len(titik) - 1), akhir_garis)#ruas tidak boleh menyambung ke garis berikutnya
+    arah_ruas = np.repeat(arah, panjang)[awal_ruas]
+    u, v = simpul[awal_ruas], simpul[awal_ruas + 1]
+    bobot = haversine(lat[u], lon[u], lat[v], lon[v])
+
+    maju = arah_ruas >= 0
+    mundur = arah_ruas <= 0
+    u, v, bobot = (
+        np.concatenate([u[maju], v[mundur]]),
+        np.concatenate([v[maju], u[mundur]]),
+        np.concatenate([bobot[maju], bobot[mundur]]),
+    )
+    beda = u != v
+    u, v, bobot = u[beda], v[beda], np.maximum(bobot[beda], 1e-9)#bobot 0 dianggap tidak ada sisi oleh scipy
+
+    #ruas ganda antara dua simpul yang sama: pakai yang terpendek (csr_matrix akan menjumlahkannya)
+    urut = np.lexsort((bobot, v, u))
+    u, v, bobot = u[urut], v[urut], bobot[urut]
+    unik = np.ones(len(u), dtype=bool)
+    unik[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+    u, v, bobot = u[unik], v[unik], bobot[unik]
+
+    #hanya komponen terhubung terbesar yang disimpan, supaya titik tidak menempel ke potongan jalan yang terputus
+    n = len(lat)
+    graf = csr_matrix((bobot, (u, v)), shape=(n, n))
+    _, label = connected_components(graf, directed=True, connection="weak")
+    utama = label == np.bincount(label).argmax()
+    nomor_baru = np.cumsum(utama) - 1
+    pakai = utama[u]
+    m = int(utama.sum())
+    graf = csr_matrix((bobot[pakai], (nomor_baru[u[pakai]], nomor_baru[v[pakai]])), shape=(m, m))
+    return {
+        "indptr": graf.indptr,
+        "indices": graf.indices,
+        "bobot": graf.data.astype(np.float32),
+        "lat": lat[utama],
+        "lon": lon[utama],
+    }
+
+
+def muat_graf(path=FILE_JALAN):
+    #graf diproses sekali per isi file lalu dipakai bersama semua sesi, None kalau file jaringan jalan tidak ada
+    if not os.path.exists(path):
+        return None
+    return muat_artefak(path, "", NAMA_FILE, simpan_graf, buka_graf)
+
+
+def simpan_graf(path, folder):
+    os.makedirs(folder, exist_ok=True)
+    data = bangun_graf(*baca_geojson(path))
+    path_graf = os.path.join(folder, NAMA_FILE)
+    tmp = f"{path_graf}.tmp-{os.getpid()}.npz"
+    np.savez(tmp, **data)
+    os.replace(tmp, path_graf)
+
+
+def buka_graf(folder, versi):
+    with np.load(os.path.join(folder, NAMA_FILE)) as data:
+        return GrafJalan(data["indptr"], data["indices"], data["bobot"], data["lat"], data["lon"], versi)
+
+
+def terdekat_jalan(graf, indeks, lat, lon, k=3, kandidat=KANDIDAT):
+    #kandidat dipilih dengan jarak garis lurus (jarak jalan tidak mungkin lebih pendek), lalu diurutkan ulang dengan jarak jalan
+    #mengembalikan (posisi_baris, jarak_jalan_km, jarak_lurus_km), bengkel yang tidak terjangkau ada di urutan belakang
+    posisi, jarak_lurus = indeks.terdekat(lat, lon, k=max(k, kandidat))
+    if len(posisi) == 0:
+        return posisi, jarak_lurus, jarak_lurus
+    k = min(k, len(posisi))
+    _, tempel_asal = graf.simpul_terdekat(lat, lon)
+    if tempel_asal[0] > TEMPEL_MAKS_KM:#pengguna di luar cakupan jaringan jalan, urutan garis lurus dipakai apa adanya
+        return posisi[:k], np.full(k, np.inf), jarak_lurus[:k]
+    #batas pencarian dimulai dari kandidat ke-k lalu diperlebar, luas area yang dijelajahi dijkstra sebanding kuadrat batas
+    #kalau sudah ada k bengkel terjangkau di dalam batas, bengkel lain pasti lebih jauh jadi urutan k teratas sudah pasti benar
+    batas_akhir = min(FAKTOR_BATAS * float(jarak_lurus[-1]), BATAS_MAKS_KM)
+    batas = min(FAKTOR_BATAS * float(jarak_lurus[k - 1]), batas_akhir)
+    while True:
+        jarak = graf.jarak_jalan(lat, lon, indeks.lat[posisi], indeks.lon[posisi], batas_km=batas)
+        if np.isfinite(jarak).sum() >= k or batas >= batas_akhir:
+            break
+        batas = min(batas * 2, batas_akhir)
+    urutan = np.lexsort((jarak_lurus, jarak))[:k]
+    return posisi[urutan], jarak[urutan], jarak_lurus[urutan]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Siapkan graf jaringan jalan untuk mode jarak jalan raya")
+    parser.add_argument("geojson", nargs="?", default=FILE_JALAN)
+    parser.add_argument("--csv", default="data/bengkel_honda_jateng_final.csv")
+    parser.add_argument("--uji", type=int, default=20, help="jumlah query acak untuk mengukur waktu")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    graf = muat_graf(args.geojson)
+    if graf is None:
+        parser.error(f"File {args.geojson} tidak ditemukan")
+    print(f"Graf {len(graf):,} simpul, {graf.csr.nnz:,} sisi siap dalam {time.perf_counter() - t0:.2f} detik")
+
+    dataset = muat_dataset(args.csv)
+    indeks = dataset.indeks
+    rng = np.random.default_rng(0)
+    _, jarak_bengkel = indeks.terdekat_banyak(graf.lat, graf.lon, k=1)
+    asal = rng.choice(np.flatnonzero(jarak_bengkel[:, 0] <= 30), size=args.uji)#titik acak di daerah yang punya bengkel dalam 30 km
+    waktu = []
+    for i in asal:
+        t0 = time.perf_counter()
+        terdekat_jalan(graf, indeks, graf.lat[i], graf.lon[i])
+        waktu.append(time.perf_counter() - t0)
+    waktu = np.array(waktu) * 1000
+    print(f"Query {args.uji} titik acak: median {np.median(waktu):.1f} ms, maks {waktu.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+R_BUMI = 6371.0 #Radius bumi dalam kilometer
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = R_BUMI
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])#konversi derajat ke radian untuk perhitungan trigonometri
+    dlat = lat2 - lat1#selisih latitud antara dua titik
+    dlon = lon2 - lon1#selisih longitud antara dua titik
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2#rumus haversine untuk menghitung jarak antara dua titik di permukaan bumi berdasarkan koordinat latitud dan longitud
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))   #menghitung sudut sentral antara dua titik berdasarkan nilai a yang dihitung sebelumnya
+    distance = R * c#menghitung jarak sebenarnya antara dua titik dengan mengalikan sudut sentral (c) dengan radius bumi (R) untuk mendapatkan hasil dalam kilometer
+    return distance
+
+
+class IndeksJarak:
+    #indeks spasial untuk semua bengkel, dibuat sekali lalu dipakai berulang kali
+    #koordinat disimpan sebagai array numpy supaya jarak ke semua bengkel dihitung sekaligus (tanpa apply per baris)
+    #BallTree dengan metrik haversine bekerja di koordinat bola satuan (radian), jadi top-k dan radius
+    #tidak perlu menyentuh semua baris
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        valid = ~(np.isnan(self.lat) | np.isnan(self.lon))#BallTree tidak bisa menerima NaN jadi baris kosong dibuang dari indeks
+        self.posisi = np.flatnonzero(valid)#posisi baris asli untuk setiap titik di dalam tree
+        self.tree = BallTree(
+            np.radians(np.column_stack([self.lat[valid], self.lon[valid]])),
+            metric="haversine",
+        )
+
+    def __len__(self):
+        return len(self.posisi)
+
+    def jarak_semua(self, lat, lon):
+        #jarak (km) dari satu titik ke setiap bengkel, urutannya sama dengan baris dataset
+        return haversine(lat, lon, self.lat, self.lon)
+
+    def terdekat(self, lat, lon, k=3):
+        #mengembalikan (posisi_baris, jarak_km) untuk k bengkel terdekat, sudah urut dari yang paling dekat
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        jarak, idx = self.tree.query(np.radians([[lat, lon]]), k=k)
+        return self.posisi[idx[0]], jarak[0] * R_BUMI
+
+    def terdekat_banyak(self, lat, lon, k=1):
+        #versi banyak titik asal sekaligus, hasilnya (posisi_baris, jarak_km) berbentuk (jumlah_titik, k)
+        k = min(k, len(self))
+        titik = np.radians(np.column_stack([np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)]))
+        jarak, idx = self.tree.query(titik, k=k)
+        return self.posisi[idx], jarak * R_BUMI
+
+    def dalam_radius(self, lat, lon, radius_km):
+        #semua bengkel dalam radius tertentu, urut dari yang paling dekat
+        idx, jarak = self.tree.query_radius(
+            np.radians([[lat, lon]]),
+            r=radius_km / R_BUMI,
+            return_distance=True,
+            sort_results=True,
+        )
+        return self.posisi[idx[0]], jarak[0] * R_BUMI
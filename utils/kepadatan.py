@@ -0,0 +1,52 @@
+import os
+import threading
+
+import numpy as np
+
+#level resolusi grid kepadatan: (ukuran sel dalam derajat, zoom minimum, zoom maksimum)
+#grid menempel ke kelipatan ukuran sel dari 0,0 jadi tidak tergantung batas provinsi tertentu
+LEVEL_KEPADATAN = [
+    (0.2, 0, 8),
+    (0.1, 9, 9),
+    (0.05, 10, 10),
+    (0.02, 11, 18),
+]
+NAMA_FILE = "kepadatan.npz"
+
+
+def grid_kepadatan(lat, lon, ukuran_sel):
+    #hitung jumlah bengkel per sel grid, hasilnya array (n, 3): lat tengah sel, lon tengah sel, jumlah
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    i = np.floor(lat[valid] / ukuran_sel).astype(np.int64)#nomor baris sel
+    j = np.floor(lon[valid] / ukuran_sel).astype(np.int64)#nomor kolom sel
+    kunci = (i << 32) + (j & 0xFFFFFFFF)#gabung baris dan kolom jadi satu bilangan supaya bisa dihitung dengan np.unique
+    kunci_unik, jumlah = np.unique(kunci, return_counts=True)
+    i_unik = kunci_unik >> 32
+    j_unik = ((kunci_unik & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000#kembalikan tanda negatif kolom
+    return np.column_stack([
+        (i_unik + 0.5) * ukuran_sel,
+        (j_unik + 0.5) * ukuran_sel,
+        jumlah,
+    ]).astype(np.float32)
+
+
+def hitung_kepadatan(lat, lon):
+    return {ukuran: grid_kepadatan(lat, lon, ukuran) for ukuran, _, _ in LEVEL_KEPADATAN}
+
+
+def muat_kepadatan(folder, lat, lon):
+    #grid disimpan di folder artefak dataset, jadi hanya dihitung sekali per versi dataset
+    path = os.path.join(folder, NAMA_FILE)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            if all(str(ukuran) in data for ukuran, _, _ in LEVEL_KEPADATAN):
+                return {ukuran: data[str(ukuran)] for ukuran, _, _ in LEVEL_KEPADATAN}
+        #level berubah sejak file dibuat, hitung ulang
+
+    grid = hitung_kepadatan(lat, lon)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}.npz"#nama unik per thread, sesi streamlit berbagi satu proses
+    np.savez(tmp, **{str(ukuran): data for ukuran, data in grid.items()})
+    os.replace(tmp, path)
+    return grid
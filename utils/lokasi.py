@@ -0,0 +1,67 @@
+#hasil perhitungan yang tergantung lokasi pengguna (jarak ke semua bengkel, k terdekat, metrik jarak)
+#di cache per lokasi yang dibulatkan, jadi gps yang goyang beberapa meter atau input yang diubah sedikit memakai hasil yang sama
+#cache dipakai bersama semua sesi, lokasi yang sering dipakai (misal titik default Semarang) hampir selalu sudah tersedia
+#setiap jenis hasil punya cache (dan hitungan hit/miss) sendiri supaya angka cache lokasi bisa dipakai untuk menyetel presisi
+import os
+
+import numpy as np
+
+from utils.cache import PRESISI_LOKASI_M, CacheLRU, kunci_lokasi, pusat_kunci
+from utils.jalan import terdekat_jalan
+from utils.statistik import metrik_lokasi
+
+MAKS_ENTRI_LOKASI = int(os.environ.get("MAKS_ENTRI_LOKASI", 256))#satu entri berisi beberapa array sepanjang jumlah bengkel
+MAKS_ENTRI_TERDEKAT = int(os.environ.get("MAKS_ENTRI_TERDEKAT", 1024))#satu entri hanya berisi k bengkel, jadi bisa lebih banyak
+
+cache_lokasi = CacheLRU(maks_entri=MAKS_ENTRI_LOKASI)#hasil_lokasi: jarak ke semua bengkel di area yang dimuat
+cache_terdekat = CacheLRU(maks_entri=MAKS_ENTRI_TERDEKAT)#hasil_ubin: k terdekat dari seluruh dataset berubin
+cache_jalan = CacheLRU(maks_entri=MAKS_ENTRI_TERDEKAT)#hasil_jalan: k terdekat menurut jarak jalan raya
+
+
+def hitung_lokasi(indeks, lat, lon, k=3):
+    jarak = indeks.jarak_semua(lat, lon)
+    posisi_terdekat, jarak_terdekat = indeks.terdekat(lat, lon, k=k)
+    hasil = {
+        "jarak": jarak,
+        "posisi_terdekat": posisi_terdekat,
+        "jarak_terdekat": jarak_terdekat,
+        **metrik_lokasi(jarak),
+    }
+    for nilai in hasil.values():
+        if isinstance(nilai, np.ndarray):
+            nilai.flags.writeable = False#array dipakai bersama semua sesi, jadi dikunci supaya tidak bisa diubah
+    return hasil
+
+
+def hasil_lokasi(dataset, lat, lon, k=3, presisi_m=PRESISI_LOKASI_M):
+    #dihitung dari titik tengah sel grid, bukan koordinat asli, supaya isi cache sama untuk semua lokasi dengan kunci yang sama
+    kunci = kunci_lokasi(lat, lon, presisi_m)
+
+    def buat():
+        lat_sel, lon_sel = pusat_kunci(kunci)
+        return {"kunci": kunci, **hitung_lokasi(dataset.indeks, lat_sel, lon_sel, k=k)}
+
+    return cache_lokasi.ambil((dataset.versi, k) + kunci, buat)
+
+
+def hasil_jalan(dataset, graf, lat, lon, k=3, presisi_m=PRESISI_LOKASI_M):
+    #k bengkel terdekat menurut jarak jalan raya, di cache dengan kunci lokasi yang dibulatkan seperti hasil_lokasi
+    kunci = kunci_lokasi(lat, lon, presisi_m)
+
+    def buat():
+        lat_sel, lon_sel = pusat_kunci(kunci)
+        posisi, jarak_jalan, jarak_lurus = terdekat_jalan(graf, dataset.indeks, lat_sel, lon_sel, k=k)
+        return {"kunci": kunci, "posisi_terdekat": posisi, "jarak_jalan": jarak_jalan, "jarak_lurus": jarak_lurus}
+
+    return cache_jalan.ambil((graf.versi, dataset.versi, k) + kunci, buat)
+
+
+def hasil_ubin(data_ubin, lat, lon, k=3, presisi_m=PRESISI_LOKASI_M):
+    #k bengkel terdekat dari seluruh dataset berubin (bukan hanya area yang dimuat), dataframe hasilnya dipakai bersama jadi read only
+    kunci = kunci_lokasi(lat, lon, presisi_m)
+
+    def buat():
+        lat_sel, lon_sel = pusat_kunci(kunci)
+        return data_ubin.terdekat(lat_sel, lon_sel, k=k)
+
+    return cache_terdekat.ambil((data_ubin.versi, k) + kunci, buat)
@@ -0,0 +1,232 @@
+import contextlib
+import threading
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster, HeatMap
+from folium.raster_layers import ImageOverlay
+from jinja2 import Template
+from streamlit_folium import generate_leaflet_string, st_folium
+
+from utils.cakupan import AMBANG_KM
+from utils.kepadatan import LEVEL_KEPADATAN
+
+UKURAN_GAMBAR_CAKUPAN = 400#sisi terpanjang gambar overlay cakupan dalam piksel
+JUDUL_PENGGUNA = "Lokasi Anda"#dipakai javascript popup untuk mencari marker pengguna di peta
+
+#popup dibuat di browser hanya saat marker diklik, data yang dikirim cuma [lat, lon, nama, alamat, wilayah] per bengkel
+#jarak dan link petunjuk arah dihitung dari posisi marker pengguna yang sedang ada di peta
+CALLBACK_BENGKEL = """
+function (row) {
+    function esc(s) {
+        return String(s).replace(/[&<>"]/g, function (c) {
+            return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c];
+        });
+    }
+    function lokasiPengguna(map) {
+        var pos = null;
+        map.eachLayer(function (l) {
+            if (l.options && l.options.title === "%(judul)s") { pos = l.getLatLng(); }
+        });
+        return pos;
+    }
+    function haversine(lat1, lon1, lat2, lon2) {
+        var r = Math.PI / 180;
+        var a = Math.pow(Math.sin((lat2 - lat1) * r / 2), 2) +
+            Math.cos(lat1 * r) * Math.cos(lat2 * r) * Math.pow(Math.sin((lon2 - lon1) * r / 2), 2);
+        return 6371.0 * 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
+    }
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.setIcon(L.AwesomeMarkers.icon({markerColor: "blue"}));
+    marker.bindPopup(function (layer) {
+        var user = layer._map ? lokasiPengguna(layer._map) : null;
+        var jarak = "", url = "https://www.google.com/maps/dir/?api=1&destination=" + row[0] + "," + row[1] + "&travelmode=driving";
+        if (user) {
+            jarak = '<b>Jarak:</b> ' + haversine(user.lat, user.lng, row[0], row[1]).toFixed(2) + ' KM<br><br>';
+            url += "&origin=" + user.lat + "," + user.lng;
+        }
+        return '<div style="font-family: Arial, sans-serif; font-size: 12px; width: 200px; color: canvastext; background-color: canvas;">' +
+            '<b style="font-size:14px; color:#e74c3c;">' + esc(row[2]) + '</b><br>' +
+            '<b>Alamat:</b> ' + esc(row[3]) + '<br>' +
+            '<b>Wilayah:</b> ' + esc(row[4]) + '<br>' +
+            '<hr style="margin:5px 0; border: 0; border-top: 1px solid #ccc;">' + jarak +
+            '<a href="' + url + '" target="_blank" style="display: block; text-align: center; background-color: #2980b9; color: white; ' +
+            'padding: 8px; border-radius: 5px; text-decoration: none; font-weight: bold;">Petunjuk Arah (Maps)</a></div>';
+    }, {maxWidth: 250});
+    return marker;
+}
+""" % {"judul": JUDUL_PENGGUNA}
+
+
+def url_google_maps(user_lat, user_lon, lat, lon):
+    return f"https://www.google.com/maps/dir/?api=1&origin={user_lat},{user_lon}&destination={lat},{lon}&travelmode=driving"
+    #travelmode=driving untuk menentukan mode perjalanan sebagai pengemudi motor
+
+
+def popup_bengkel(row, jarak_km, user_lat, user_lon):
+    return f"""
+        <div style="font-family: Arial, sans-serif; font-size: 12px; width: 200px; color: canvastext;
+        background-color: canvas;">
+        <b style="font-size:14px; color:#e74c3c;">{row['Nama']}</b><br>
+        <b>Alamat:</b> {row['Alamat']}<br>
+        <b>Wilayah:</b> {row['Wilayah']}<br>
+        <hr style="margin:5px 0; border: 0; border-top: 1px solid #ccc;">
+        <b>Jarak:</b> {jarak_km:.2f} KM<br><br>
+
+        <a href="{url_google_maps(user_lat, user_lon, row['Latitude'], row['Longitude'])}" target="_blank"
+        style="display: block; text-align: center;
+                background-color: #2980b9; color: white;
+                padding: 8px; border-radius: 5px;
+                text-decoration: none; font-weight: bold;">
+            Petunjuk Arah (Maps)
+        </a>
+        </div>
+    """
+
+
+def marker_pengguna(user_lat, user_lon):
+    return folium.Marker(
+        location=[user_lat, user_lon],
+        popup="<b>Lokasi Anda Sekarang</b>",
+        icon=folium.Icon(color='red', icon='user', prefix='fa'),
+        z_index_offset=1000,
+        title=JUDUL_PENGGUNA,
+    )
+
+
+def lapisan_bengkel(df):
+    #semua bengkel dikirim sebagai satu lapisan FastMarkerCluster, cluster dihitung di browser
+    #koordinat sudah divalidasi saat pembersihan data (utils/cleanReversData.py), jadi tidak dicek lagi per baris
+    data = list(zip(
+        df['Latitude'].to_numpy(np.float64).round(6).tolist(),
+        df['Longitude'].to_numpy(np.float64).round(6).tolist(),
+        df['Nama'].astype(str).tolist(),
+        df['Alamat'].astype(str).tolist(),
+        df['Wilayah'].astype(str).tolist(),
+    ))
+    return FastMarkerCluster(data, callback=CALLBACK_BENGKEL, name="Bengkel")
+
+
+def marker_terdekat(df_terdekat, user_lat, user_lon):
+    #bengkel terdekat digambar terpisah dengan warna hijau di atas cluster
+    markers = []
+    for _, row in df_terdekat.iterrows():
+        markers.append(folium.Marker(
+            location=[row['Latitude'], row['Longitude']],
+            popup=folium.Popup(popup_bengkel(row, row['Jarak_KM'], user_lat, user_lon), max_width=250),
+            icon=folium.Icon(color='green'),
+            z_index_offset=500,
+        ))
+    return markers
+
+
+class PilihLevelZoom(MacroElement):
+    #tampilkan hanya satu lapisan heatmap yang cocok dengan zoom peta, pergantian dilakukan di browser
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var level = [
+                {% for layer, zoom_min, zoom_max in this.level %}
+                {layer: {{ layer.get_name() }}, min: {{ zoom_min }}, max: {{ zoom_max }}},
+                {% endfor %}
+            ];
+            function atur() {
+                var z = map.getZoom();
+                level.forEach(function (l) {
+                    var cocok = z >= l.min && z <= l.max;
+                    if (cocok && !map.hasLayer(l.layer)) { map.addLayer(l.layer); }
+                    if (!cocok && map.hasLayer(l.layer)) { map.removeLayer(l.layer); }
+                });
+            }
+            map.on("zoomend", atur);
+            atur();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, level):
+        super().__init__()
+        self._name = "PilihLevelZoom"
+        self.level = level
+
+
+def lapisan_heatmap(kepadatan, m):
+    #satu heatmap per level grid kepadatan, bobot dinormalisasi 0-1 per level
+    level = []
+    for ukuran, zoom_min, zoom_max in LEVEL_KEPADATAN:
+        grid = kepadatan[ukuran]
+        bobot = grid[:, 2] / grid[:, 2].max()
+        heat_data = np.column_stack([grid[:, :2].round(4), bobot.round(3)]).tolist()
+        heatmap = HeatMap(
+            heat_data,
+            radius=25,#kalo radius semakin besar maka area panas akan semakin luas, tapi detail titik panas akan berkurang
+            blur=15,
+            max_zoom=zoom_min,#intensitas penuh mulai dari zoom terkecil level ini
+        )
+        heatmap.add_to(m)
+        level.append((heatmap, zoom_min, zoom_max))
+    PilihLevelZoom(level).add_to(m)
+
+
+def lapisan_cakupan(cakupan, ambang_km=AMBANG_KM):
+    #raster jarak ke bengkel terdekat sebagai gambar transparan: hijau = dekat, merah = lebih dari 2x ambang
+    #sel di luar area layanan dibuat transparan
+    langkah = max(1, int(np.ceil(max(cakupan["jarak"].shape) / UKURAN_GAMBAR_CAKUPAN)))#raster diperkecil supaya gambar yang dikirim ke browser tetap kecil
+    jarak = cakupan["jarak"][::langkah, ::langkah]
+    mask = cakupan["mask"][::langkah, ::langkah]
+    nilai = np.clip(np.nan_to_num(jarak, nan=0) / (2 * ambang_km), 0, 1)
+    rgba = np.zeros(jarak.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = (255 * np.clip(2 * nilai, 0, 1)).astype(np.uint8)
+    rgba[..., 1] = (255 * np.clip(2 - 2 * nilai, 0, 1)).astype(np.uint8)
+    rgba[..., 3] = np.where(mask, 150, 0).astype(np.uint8)
+    lat_min, lat_max, lon_min, lon_max = cakupan["batas"].tolist()
+    return ImageOverlay(
+        rgba[::-1],#baris raster urut dari selatan, gambar harus mulai dari utara
+        bounds=[[lat_min, lon_min], [lat_max, lon_max]],
+        mercator_project=True,
+        name="Kesenjangan Cakupan",
+    )
+
+
+def buat_peta_dasar(dataset, show_heatmap=True, show_markers=True, show_cakupan=False):
+    #lapisan statis yang tidak bergantung lokasi pengguna: heatmap dan semua bengkel
+    #dibuat sekali per versi dataset, script leaflet nya tetap sama sehingga browser tidak memuat ulang peta
+    df = dataset.df
+    m = folium.Map(location=[df['Latitude'].median(), df['Longitude'].median()], zoom_start=9)
+    if show_cakupan:
+        lapisan_cakupan(dataset.cakupan).add_to(m)
+    if show_heatmap:
+        lapisan_heatmap(dataset.kepadatan, m)
+    if show_markers:
+        lapisan_bengkel(df).add_to(m)#semua bengkel dikirim sekali sebagai satu lapisan cluster, popup baru dibuat saat marker diklik
+    m.get_root().render()
+    generate_leaflet_string(m)#render pertama st_folium mengganti id elemen, dilakukan di sini supaya script sudah sama sejak rerun pertama
+    m._lock_tampil = threading.Lock()#peta dasar dipakai bersama semua sesi, st_folium mengubah isinya saat dirender
+    return m
+
+
+def lapisan_pengguna(user_lat, user_lon, df_terdekat=None):
+    #lapisan dinamis yang berubah saat lokasi berubah: marker pengguna dan 3 bengkel terdekat (hijau)
+    fg = folium.FeatureGroup(name="Lokasi Pengguna")
+    marker_pengguna(user_lat, user_lon).add_to(fg)
+    if df_terdekat is not None:
+        for marker in marker_terdekat(df_terdekat, user_lat, user_lon):
+            marker.add_to(fg)
+    return fg
+
+
+def tampilkan_peta(m, fg, center, **kwargs):
+    #script peta dasar tidak berubah jadi browser tidak membuat ulang peta, hanya lapisan dinamis (fg) dan titik tengah yang diganti
+    #batasan: st_folium tetap membuat string html/js seluruh peta dan mengirimnya ke browser setiap rerun
+    #render=False hanya melewati render ulang template folium untuk peta dasar yang sudah dirender di buat_peta_dasar
+    #returned_objects kosong supaya st_folium tidak mengirim balik state peta yang tidak dipakai (dan tidak memicu rerun)
+    lock = getattr(m, "_lock_tampil", None)#hanya peta dasar bersama yang dikunci, satu kunci per peta
+    with lock or contextlib.nullcontext():
+        try:
+            return st_folium(m, feature_group_to_add=fg, center=center, returned_objects=[], render=lock is None, **kwargs)
+        finally:
+            for nama, anak in list(m._children.items()):#st_folium menempelkan fg ke peta, dilepas lagi supaya peta bersama tetap bersih
+                if anak is fg:
+                    del m._children[nama]
@@ -1,93 +1,354 @@
+#scraper dealer honda
+#mode manual (default): browser terbuka, filter provinsi & kota diatur sendiri lalu tekan ENTER
+#mode otomatis: python utils/scrap.py --headless --workers 4 --provinsi "JAWA TENGAH"
+#filter provinsi/kota dibagi ke beberapa browser, setiap halaman langsung disimpan ke folder checkpoint
+#jadi kalau berhenti di tengah jalan, jalankan perintah yang sama untuk melanjutkan
+#uji offline: python -m http.server 8000 -d utils/fixtures
+#             python utils/scrap.py --headless --url http://localhost:8000/dealer.html
+import argparse
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
-import time
+from selenium.webdriver.support.ui import Select, WebDriverWait
+
+URL_DEALER = "https://www.astra-honda.com/dealer"
+SEL_DEALER = "div[class*='dealer-box']"
+SEL_NEXT = "button.paginate-btn.next"
+SEL_PROVINSI = "select[name='province']"#selector filter, sesuaikan kalau struktur halaman dealer berubah
+SEL_KOTA = "select[name='city']"
+SEL_KOSONG = "div[class*='dealer-empty']"#pesan "dealer tidak ditemukan" saat filter tidak punya hasil
+FOLDER_CHECKPOINT = os.path.join("data", "scrap_checkpoint")
+OUTPUT = os.path.join("data", "bengkel_honda_jateng.csv")#input untuk python -m utils.cleanReversData
+TIMEOUT = 15
+_print_lock = threading.Lock()
+
+
+def log(pesan):
+    with _print_lock:
+        print(pesan)
+
+
+def buat_driver(headless):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")#tanpa jendela browser, bisa jalan di server
+        options.add_argument("--window-size=1280,2000")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+    return webdriver.Chrome(service=Service(), options=options)
+
+
+def nama_pertama(driver):
+    try:
+        return driver.find_element(By.CSS_SELECTOR, SEL_DEALER).find_element(By.TAG_NAME, "h4").text
+    except (NoSuchElementException, StaleElementReferenceException):
+        return None
+
+
+class HalamanBerganti:
+    #kondisi tunggu: daftar dealer sudah muncul dan dealer pertama berbeda dengan halaman sebelumnya
+    #pengganti time.sleep, selesai begitu isi halaman benar-benar berubah
+    def __init__(self, nama_lama):
+        self.nama_lama = nama_lama
+
+    def __call__(self, driver):
+        nama = nama_pertama(driver)
+        return nama is not None and nama != self.nama_lama
+
+
+def pesan_kosong(driver):
+    #elemen pesan hasil kosong yang sedang tampil, None kalau tidak ada
+    try:
+        for elemen in driver.find_elements(By.CSS_SELECTOR, SEL_KOSONG):
+            if elemen.is_displayed():
+                return elemen
+    except StaleElementReferenceException:
+        pass
+    return None
+
 
-options = webdriver.ChromeOptions()
-driver = webdriver.Chrome(service=Service(), options=options)
+class HasilMuncul:
+    #kondisi tunggu halaman pertama setelah filter dipilih: "dealer" kalau daftar dealer baru muncul,
+    #"kosong" kalau pesan hasil kosong yang baru muncul, timeout berarti halaman belum termuat (bukan berarti kosong)
+    def __init__(self, nama_lama, kosong_lama):
+        self.nama_lama = nama_lama
+        self.kosong_lama = kosong_lama
 
-url = "https://www.astra-honda.com/dealer"
-driver.get(url)
+    def __call__(self, driver):
+        if HalamanBerganti(self.nama_lama)(driver):
+            return "dealer"
+        kosong = pesan_kosong(driver)
+        return "kosong" if kosong is not None and kosong != self.kosong_lama else False
 
-print("=== SCRAPER BENGKEL HONDA JATENG ===")
-print("SILAHKAN FILTER PROVINSI & KOTA DI BROWSER.")
-input("Jika daftar sudah muncul, tekan ENTER untuk mulai...")
 
-list_bengkel = []
-halaman_sekarang = 1
-nama_terakhir = "" 
+class OpsiBerubah:
+    #kondisi tunggu: pilihan di dropdown (misalnya kota) sudah dimuat ulang setelah filter lain diganti
+    def __init__(self, selector, opsi_lama):
+        self.selector = selector
+        self.opsi_lama = opsi_lama
+
+    def __call__(self, driver):
+        try:
+            opsi = daftar_opsi(driver, self.selector)
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        return opsi if opsi and opsi != self.opsi_lama else False
+
+
+def daftar_opsi(driver, selector):
+    select = Select(driver.find_element(By.CSS_SELECTOR, selector))
+    return [o.text.strip() for o in select.options if o.get_attribute("value")]#lewati opsi kosong "Pilih ..."
+
+
+def ambil_dealer(driver):
+    #fungsi get data perhalaman
+    list_bengkel = []
+    for dealer in driver.find_elements(By.CSS_SELECTOR, SEL_DEALER):
+        try:
+            nama = dealer.find_element(By.TAG_NAME, "h4").text
+            alamat = dealer.find_element(By.CSS_SELECTOR, "div[class*='box-address']").text
+            kota_kab = dealer.find_element(By.CSS_SELECTOR, "div[class*='box-city']").text
+            link_href = dealer.find_element(By.TAG_NAME, "a").get_attribute("href")#bawa alamat url di a
+
+            lat, lon = None, None#definisi variavle kosong
+            if link_href and "destination=" in link_href:#kalo di destination ada linke href nyamaka
+                coords = link_href.split("destination=")[1].split("&")[0]
+                #dia bvakal motong link nya sampe destination- [1] lalu
+                #dia akan motong lagi sampe & [0] untuk mendapatkan koordinatnya saja
+                if "," in coords:
+                    lat, lon = coords.split(",")
+                    #lalu di potong lagi koodina nya jadi dua lat dan lon berdasarkan ,
+
+            list_bengkel.append({
+                'Nama': nama,
+                'Alamat': alamat,
+                'Wilayah': kota_kab,
+                'Latitude': lat,
+                'Longitude': lon
+            })
+        except (NoSuchElementException, StaleElementReferenceException):
+            continue
+    return list_bengkel
+
+
+def klik_next(driver):
+    #fungsi button next, False kalau sudah halaman terakhir
+    try:
+        next_btn = driver.find_element(By.CSS_SELECTOR, SEL_NEXT)#get beradasrkan kelas
+    except NoSuchElementException:
+        return False
+    if "disabled" in (next_btn.get_attribute("class") or "") or next_btn.get_attribute("disabled"):
+        return False#kalo si class nya jadi disable maka mencapai akhir
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
+    driver.execute_script("arguments[0].click();", next_btn)#klik halaman selanjutnya
+    return True
+
+
+def pilih_opsi(driver, selector, teks):
+    Select(driver.find_element(By.CSS_SELECTOR, selector)).select_by_visible_text(teks)
+
+
+def daftar_tugas(driver, url, filter_provinsi=None):
+    #bagi ruang filter jadi pasangan (provinsi, kota), satu pasangan = satu tugas untuk satu browser
+    driver.get(url)
+    wait = WebDriverWait(driver, TIMEOUT)
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SEL_PROVINSI)))
+    tugas = []
+    opsi_kota = []
+    for provinsi in daftar_opsi(driver, SEL_PROVINSI):
+        if filter_provinsi and provinsi.lower() not in {p.lower() for p in filter_provinsi}:
+            continue
+        pilih_opsi(driver, SEL_PROVINSI, provinsi)
+        try:
+            opsi_kota = wait.until(OpsiBerubah(SEL_KOTA, opsi_kota))
+        except TimeoutException:
+            log(f"Peringatan: daftar kota untuk {provinsi} tidak berubah, dilewati.")
+            continue
+        tugas.extend((provinsi, kota) for kota in opsi_kota)
+    return tugas
+
 
-try:
+def slug(teks):
+    return re.sub(r"[^a-z0-9]+", "_", teks.lower()).strip("_")
+
+
+def simpan_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)#tulis ke file sementara dulu supaya checkpoint tidak pernah setengah jadi
+
+
+def scrap_tugas(driver, url, provinsi, kota, folder_checkpoint):
+    folder = os.path.join(folder_checkpoint, f"{slug(provinsi)}__{slug(kota)}")
+    if os.path.exists(os.path.join(folder, "selesai.json")):
+        return 0#tugas ini sudah selesai di run sebelumnya
+    os.makedirs(folder, exist_ok=True)
+    sudah = len(glob.glob(os.path.join(folder, "hal_*.json")))#halaman yang sudah tersimpan akan dilewati
+
+    driver.get(url)
+    wait = WebDriverWait(driver, TIMEOUT)
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SEL_PROVINSI)))
+    pilih_opsi(driver, SEL_PROVINSI, provinsi)
+    wait.until(lambda d: kota in (OpsiBerubah(SEL_KOTA, None)(d) or []))#tunggu daftar kota untuk provinsi ini termuat
+    nama_lama = nama_pertama(driver)
+    kosong_lama = pesan_kosong(driver)
+    pilih_opsi(driver, SEL_KOTA, kota)
+
+    try:
+        hasil = wait.until(HasilMuncul(nama_lama, kosong_lama))
+    except TimeoutException:
+        log(f"[{provinsi} / {kota}] halaman 1 tidak termuat, dicoba lagi di run berikutnya.")
+        return 0#tidak ditandai selesai, timeout bisa karena jaringan lambat
+    if hasil == "kosong":
+        log(f"[{provinsi} / {kota}] tidak ada dealer.")
+        simpan_json(os.path.join(folder, "selesai.json"), {"halaman": 0})
+        return 0
+
+    halaman = 1
+    jumlah = 0
     while True:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='dealer-box']"))
-        )#get class html dengan nama dealer-box
-        time.sleep(2)#jeda dua detik 
-        dealers = driver.find_elements(By.CSS_SELECTOR, "div[class*='dealer-box']")#simpan ke variable
-        
-        nama_pertama_halaman_ini = dealers[0].find_element(By.TAG_NAME, "h4").text#gert nama dealer pertama untuk di jadikan validasi
-        if nama_pertama_halaman_ini == nama_terakhir:#kalo deales pertama sama dengan nama terakhir berarti halaman tidak berpindah
-            print(f"Peringatan: Halaman {halaman_sekarang} tidak berpindah. Mencoba klik Next lagi...")
-        else:
-            nama_terakhir = nama_pertama_halaman_ini
-            print(f"\n[HALAMAN {halaman_sekarang}]")
-            print(f"Menemukan {len(dealers)} data di halaman ini.")
-            #fungsi get data perhalaman 
-            for i, dealer in enumerate(dealers, 1):
+        if halaman > 1:
+            try:
+                wait.until(HalamanBerganti(nama_lama))
+            except TimeoutException:
+                log(f"[{provinsi} / {kota}] halaman {halaman} tidak berpindah, berhenti.")
+                return jumlah#tidak ditandai selesai supaya dicoba lagi di run berikutnya
+        nama_lama = nama_pertama(driver)
+
+        if halaman > sudah:
+            data = ambil_dealer(driver)
+            simpan_json(os.path.join(folder, f"hal_{halaman:04d}.json"), data)
+            jumlah += len(data)
+            log(f"[{provinsi} / {kota}] halaman {halaman}: {len(data)} data")
+
+        if not klik_next(driver):
+            break
+        halaman += 1
+
+    simpan_json(os.path.join(folder, "selesai.json"), {"halaman": halaman})
+    return jumlah
+
+
+def gabung_checkpoint(folder_checkpoint, output):
+    list_bengkel = []
+    for path in sorted(glob.glob(os.path.join(folder_checkpoint, "*", "hal_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            list_bengkel.extend(json.load(f))
+    if not list_bengkel:
+        return 0
+    df = pd.DataFrame(list_bengkel).drop_duplicates()
+    df.to_csv(output, index=False)
+    return len(df)
+
+
+def mode_otomatis(args):
+    driver = buat_driver(args.headless)
+    try:
+        tugas = daftar_tugas(driver, args.url, args.provinsi)
+    finally:
+        driver.quit()
+    log(f"Total {len(tugas)} kombinasi provinsi/kota, dikerjakan {args.workers} browser.")
+
+    antrian = queue.Queue()
+    for t in tugas:
+        antrian.put(t)
+
+    def worker():
+        driver = buat_driver(args.headless)#satu browser per worker, dipakai untuk banyak tugas
+        try:
+            while True:
+                try:
+                    provinsi, kota = antrian.get_nowait()
+                except queue.Empty:
+                    return
                 try:
-                    nama = dealer.find_element(By.TAG_NAME, "h4").text
-                    alamat = dealer.find_element(By.CSS_SELECTOR, "div[class*='box-address']").text
-                    kota_kab = dealer.find_element(By.CSS_SELECTOR, "div[class*='box-city']").text
-                    link_href = dealer.find_element(By.TAG_NAME, "a").get_attribute("href")#bawa alamat url di a
-
-                    lat, lon = None, None#definisi variavle kosong
-                    if "destination=" in link_href:#kalo di destination ada linke href nyamaka
-                        coords = link_href.split("destination=")[1].split("&")[0]
-                        #dia bvakal motong link nya sampe destination- [1] lalu
-                        #dia akan motong lagi sampe & [0] untuk mendapatkan koordinatnya saja
-                        if "," in coords:
-                            lat, lon = coords.split(",")
-                            #lalu di potong lagi koodina nya jadi dua lat dan lon berdasarkan ,
-
-                    list_bengkel.append({
-                        'Nama': nama,
-                        'Alamat': alamat,
-                        'Wilayah': kota_kab,
-                        'Latitude': lat,
-                        'Longitude': lon
-                    })    
-                    print(f"✔Data {i}: {nama}") 
-                except:
-                    continue
-        #fungsi button next
+                    scrap_tugas(driver, args.url, provinsi, kota, args.checkpoint)
+                except Exception as e:
+                    log(f"[{provinsi} / {kota}] gagal: {e}")#checkpoint tetap tersimpan, run berikutnya melanjutkan
+        finally:
+            driver.quit()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for f in [pool.submit(worker) for _ in range(args.workers)]:
+            f.result()
+
+
+def folder_manual(driver, folder_checkpoint):
+    #folder checkpoint mode manual sesuai filter yang dipilih di browser, supaya run dengan filter lain tidak menimpanya
+    teks = []
+    for selector in (SEL_PROVINSI, SEL_KOTA):
         try:
-            next_btn = driver.find_element(By.CSS_SELECTOR, "button.paginate-btn.next")#get beradasrkan kelas
-            
-            if "disabled" in next_btn.get_attribute("class") or next_btn.get_attribute("disabled"):
-                print("\nSudah mencapai halaman terakhir.")#kalo si clas para byttton nya itu berubah jadi disable atau
-                #si class nya jadi disable maka mencapai akhir
+            opsi = Select(driver.find_element(By.CSS_SELECTOR, selector)).first_selected_option
+            teks.append(opsi.text.strip() if opsi.get_attribute("value") else "")
+        except NoSuchElementException:
+            teks.append("")
+    if not any(teks):#filter tidak terbaca (misal struktur halaman berubah), pakai satu folder per run
+        return os.path.join(folder_checkpoint, f"manual-{time.strftime('%Y%m%d-%H%M%S')}")
+    return os.path.join(folder_checkpoint, "manual__" + "__".join(slug(t) or "semua" for t in teks))
+
+
+def mode_manual(args):
+    driver = buat_driver(args.headless)
+    driver.get(args.url)
+
+    print("=== SCRAPER BENGKEL HONDA JATENG ===")
+    print("SILAHKAN FILTER PROVINSI & KOTA DI BROWSER.")
+    input("Jika daftar sudah muncul, tekan ENTER untuk mulai...")
+
+    folder = folder_manual(driver, args.checkpoint)
+    os.makedirs(folder, exist_ok=True)
+    halaman_sekarang = 1
+    nama_terakhir = None
+    try:
+        while True:
+            WebDriverWait(driver, TIMEOUT).until(HalamanBerganti(nama_terakhir))#tunggu sampai isi halaman benar-benar berganti
+            nama_terakhir = nama_pertama(driver)
+            data = ambil_dealer(driver)
+            simpan_json(os.path.join(folder, f"hal_{halaman_sekarang:04d}.json"), data)
+            print(f"\n[HALAMAN {halaman_sekarang}]")
+            print(f"Menemukan {len(data)} data di halaman ini.")
+
+            if not klik_next(driver):
+                print("\nSudah mencapai halaman terakhir.")
                 break
-            
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
-            #scroll otomatis sampai terlihat button next nya berenti tepat di tengah 
-            #scrool view yuntuk scriooll 
-            time.sleep(1)#delay
-            driver.execute_script("arguments[0].click();", next_btn)#klik halaman selanjutnya
-            
             halaman_sekarang += 1
-            time.sleep(4)#delay
-            
-        except Exception as e:
-            print(f"\nBerhenti: {e}")
-            break
+    except TimeoutException:
+        print(f"\nBerhenti: halaman {halaman_sekarang} tidak berpindah.")
+    finally:
+        driver.quit()#clos selenium
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper dealer Honda")
+    parser.add_argument("--url", default=URL_DEALER)
+    parser.add_argument("--headless", action="store_true", help="jalankan tanpa jendela browser dan tanpa langkah manual")
+    parser.add_argument("--workers", type=int, default=1, help="jumlah browser yang jalan bersamaan (mode headless)")
+    parser.add_argument("--provinsi", action="append", help="batasi ke provinsi tertentu, bisa diulang")
+    parser.add_argument("--checkpoint", default=FOLDER_CHECKPOINT, help="folder checkpoint per halaman")
+    parser.add_argument("--output", default=OUTPUT)
+    args = parser.parse_args()
+
+    if args.headless:
+        mode_otomatis(args)
+    else:
+        mode_manual(args)
+
+    total = gabung_checkpoint(args.checkpoint, args.output)#semua halaman yang sudah tersimpan digabung, termasuk dari run sebelumnya
+    print(f"\nSELESAI! Total {total} data unik disimpan ke {args.output}.")
 
-finally:#kalo terjadi kiamat data akan tetap di simpan di bagian terakhir data di input
-    if list_bengkel:
-        df = pd.DataFrame(list_bengkel).drop_duplicates()
-        df.to_csv('bengkel_honda_jateng_coba.csv', index=False)
-        print(f"\nSELESAI! Total {len(df)} data unik disimpan.")
 
-    driver.quit()#clos selenium
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.cakupan import luas_sel
+
+NAMA_FILE = "statistik_wilayah.csv"
+
+
+def hitung_statistik(df, cakupan):
+    #semua agregat yang tidak tergantung lokasi pengguna, satu baris per wilayah, urut dari yang terbanyak
+    stat = (
+        df.groupby("Wilayah", observed=True)
+        .agg(
+            Jumlah_Bengkel=("Nama", "count"),#jumlah bengkel di setiap wilayah
+            Latitude=("Latitude", "mean"),#titik tengah (centroid) bengkel di setiap wilayah
+            Longitude=("Longitude", "mean"),
+        )
+        .reset_index()
+    )
+    stat["Wilayah"] = stat["Wilayah"].astype(str)
+
+    #luas area layanan = luas semua sel raster cakupan yang bengkel terdekatnya ada di wilayah tersebut
+    kode_wilayah = pd.Categorical(df["Wilayah"], categories=stat["Wilayah"]).codes
+    terdekat = cakupan["terdekat"][cakupan["mask"]]
+    luas = np.bincount(
+        kode_wilayah[terdekat],
+        weights=luas_sel(cakupan)[cakupan["mask"]],
+        minlength=len(stat),
+    )
+    stat["Luas_Layanan_KM2"] = luas.round(1)
+    stat["Bengkel_per_100KM2"] = np.where(luas > 0, stat["Jumlah_Bengkel"] / np.maximum(luas, 1e-9) * 100, np.nan).round(3)
+
+    stat = stat.sort_values(["Jumlah_Bengkel", "Wilayah"], ascending=[False, True], ignore_index=True)
+    stat["Peringkat"] = np.arange(1, len(stat) + 1)
+    return stat
+
+
+def muat_statistik(folder, df, cakupan):
+    #disimpan di folder artefak dataset, jadi aplikasi cukup membaca tabel kecil ini tanpa groupby ulang
+    path = os.path.join(folder, NAMA_FILE)
+    if os.path.exists(path):
+        return pd.read_csv(path)
+    stat = hitung_statistik(df, cakupan)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"#nama unik per thread, sesi streamlit berbagi satu proses
+    stat.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return stat
+
+
+def metrik_lokasi(jarak, radius_km=10):
+    #metrik yang tergantung lokasi pengguna, semuanya diambil dari satu kali argsort array jarak
+    urutan = np.argsort(jarak, kind="stable")
+    jarak_urut = jarak[urutan]
+    n_dekat = int(np.searchsorted(jarak_urut, radius_km, side="right"))
+    return {
+        "urutan": urutan,#posisi baris dari yang terdekat
+        "jarak_urut": jarak_urut,#dipakai untuk kurva kumulatif
+        "jarak_min": float(jarak_urut[0]) if len(jarak_urut) else float("nan"),
+        "posisi_dekat": urutan[:n_dekat],#bengkel dalam radius, sudah urut
+    }
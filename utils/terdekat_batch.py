@@ -0,0 +1,118 @@
+#bengkel terdekat untuk banyak titik asal sekaligus (alamat pelanggan, posisi kendaraan, dll)
+#cara pakai: python -m utils.terdekat_batch titik_asal.csv [--output hasil.csv] [-k 3] [--workers 4]
+#file titik asal dibaca per potongan (chunk) dan setiap chunk dikerjakan di proses terpisah,
+#jumlah chunk yang sedang diproses dibatasi jadi memori tetap kecil berapapun jumlah titik asal
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import muat_dataset
+
+CSV_BENGKEL = os.path.join("data", "bengkel_honda_jateng_final.csv")
+KOLOM_HASIL = ["Nama", "Alamat", "Wilayah", "Latitude", "Longitude"]#kolom bengkel yang ditulis untuk setiap peringkat
+UKURAN_CHUNK = 50_000
+
+_dataset = None#dataset di setiap proses worker, dimuat sekali dari artefak (memory map) saat worker dibuat
+
+
+def cari_terdekat(dataset, lat, lon, k=3):
+    #k bengkel terdekat untuk setiap titik asal, hasilnya satu baris per titik dengan kolom Nama_1, Jarak_KM_1, Nama_2, ...
+    #titik asal dengan koordinat kosong/tidak valid tetap ada di hasil dengan kolom bengkel kosong
+    lat = pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(np.float64)
+    lon = pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    k = min(k, len(dataset.indeks))
+
+    posisi = np.full((len(lat), k), -1, dtype=np.intp)
+    jarak = np.full((len(lat), k), np.nan)
+    if valid.any() and k > 0:
+        posisi[valid], jarak[valid] = dataset.indeks.terdekat_banyak(lat[valid], lon[valid], k=k)
+
+    df = dataset.df
+    kolom = {}
+    for i in range(k):
+        p = posisi[:, i]
+        ada = p >= 0
+        p_aman = np.where(ada, p, 0)
+        for nama in KOLOM_HASIL:
+            nilai = df[nama]
+            if isinstance(nilai.dtype, pd.CategoricalDtype):
+                #kode kategori -1 berarti kosong, jadi teks tidak perlu disalin jadi object per baris
+                codes = np.where(ada, nilai.cat.codes.to_numpy()[p_aman], -1)
+                kolom[f"{nama}_{i + 1}"] = pd.Categorical.from_codes(codes, categories=nilai.cat.categories)
+            else:
+                kolom[f"{nama}_{i + 1}"] = np.where(ada, nilai.to_numpy()[p_aman], np.nan)
+        kolom[f"Jarak_KM_{i + 1}"] = jarak[:, i].round(3)
+    return pd.DataFrame(kolom)
+
+
+def _init_worker(csv_bengkel):
+    global _dataset
+    _dataset = muat_dataset(csv_bengkel)
+
+
+def _proses_chunk(chunk, kolom_lat, kolom_lon, k, header):
+    #dijalankan di worker, hasilnya langsung berupa teks csv supaya penulisan csv juga ikut paralel
+    hasil = cari_terdekat(_dataset, chunk[kolom_lat], chunk[kolom_lon], k)
+    keluar = pd.concat([chunk.reset_index(drop=True), hasil], axis=1)
+    return len(chunk), keluar.to_csv(index=False, header=header)
+
+
+def proses_file(path_asal, path_output, csv_bengkel=CSV_BENGKEL, k=3, workers=None,
+                chunksize=UKURAN_CHUNK, kolom_lat="Latitude", kolom_lon="Longitude"):
+    workers = workers or os.cpu_count() or 1
+    muat_dataset(csv_bengkel)#artefak dibangun sekali di proses utama, worker cukup membacanya
+    maks_antrian = workers * 2#chunk yang dibaca tapi belum ditulis, membatasi pemakaian memori
+
+    tmp = f"{path_output}.tmp"
+    total = 0
+    with open(tmp, "w", encoding="utf-8", newline="") as f, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csv_bengkel,)) as pool:
+        antrian = deque()
+
+        def tulis_paling_awal():
+            nonlocal total
+            n, teks = antrian.popleft().result()#urutan hasil sama dengan urutan titik asal
+            f.write(teks)
+            total += n
+            print(f"Diproses {total:,} titik asal...")
+
+        for i, chunk in enumerate(pd.read_csv(path_asal, chunksize=chunksize)):
+            if kolom_lat not in chunk.columns or kolom_lon not in chunk.columns:
+                raise ValueError(f"Kolom '{kolom_lat}'/'{kolom_lon}' tidak ada di {path_asal}")
+            antrian.append(pool.submit(_proses_chunk, chunk, kolom_lat, kolom_lon, k, i == 0))
+            if len(antrian) >= maks_antrian:
+                tulis_paling_awal()
+        while antrian:
+            tulis_paling_awal()
+    os.replace(tmp, path_output)#file lama baru diganti setelah semua chunk selesai
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cari bengkel terdekat untuk banyak titik asal dari file csv")
+    parser.add_argument("asal", help="csv titik asal, minimal berisi kolom latitude dan longitude")
+    parser.add_argument("--output", help="default: <asal>_terdekat.csv")
+    parser.add_argument("--csv", default=CSV_BENGKEL, help="dataset bengkel")
+    parser.add_argument("-k", type=int, default=3, help="jumlah bengkel terdekat per titik asal")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses, default semua core")
+    parser.add_argument("--chunksize", type=int, default=UKURAN_CHUNK)
+    parser.add_argument("--lat", default="Latitude", help="nama kolom latitude di file asal")
+    parser.add_argument("--lon", default="Longitude", help="nama kolom longitude di file asal")
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.asal)[0]}_terdekat.csv"
+    t0 = time.perf_counter()
+    total = proses_file(args.asal, output, args.csv, args.k, args.workers, args.chunksize, args.lat, args.lon)
+    durasi = time.perf_counter() - t0
+    print(f"Selesai! {total:,} titik asal dalam {durasi:.1f} detik ({total / max(durasi, 1e-9) * 60:,.0f} titik/menit)")
+    print(f"Hasil disimpan sebagai: {output}")
+
+
+if __name__ == "__main__":
+    main()
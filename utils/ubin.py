@@ -0,0 +1,213 @@
+#dataset dibagi menjadi ubin (tile) grid lintang/bujur supaya data skala nasional tidak perlu dimuat sekaligus
+#struktur: data/cache/<nama>-<versi>-ubin/manifest.json + satu folder artefak kolom (format utils.dataset) per ubin
+#aplikasi hanya memuat ubin di sekitar lokasi pengguna, pencarian terdekat memperluas cincin ubin sampai hasilnya pasti benar
+#grid kepadatan dibuat per ubin saat persiapan, gabungan beberapa ubin cukup menyambung grid-nya
+#raster cakupan dan statistik gabungan baru dihitung saat dibutuhkan, folder area-* dibatasi MAKS_FOLDER_AREA (yang paling lama tidak dipakai dihapus)
+#persiapan ubin: python -m utils.ubin [--csv data/bengkel_honda_jateng_final.csv]
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils.cache import CacheLRU
+from utils.dataset import KOLOM_KOORDINAT, KOLOM_TEKS, Dataset, baca_artefak, bangun_artefak, muat_artefak
+from utils.jarak import R_BUMI
+from utils.kepadatan import LEVEL_KEPADATAN, muat_kepadatan
+
+UKURAN_UBIN = 1.0#ukuran ubin dalam derajat (sekitar 111 km)
+RADIUS_AREA_KM = 150#ubin yang dimuat untuk peta dan statistik: kotak di sekitar lokasi pengguna dengan radius ini
+MAKS_BARIS_SEMUA = int(os.environ.get("MAKS_BARIS_SEMUA", 20_000))#dataset kecil (misal satu provinsi) tetap dimuat utuh
+UKURAN_CHUNK = 100_000
+MAKS_FOLDER_AREA = int(os.environ.get("MAKS_FOLDER_AREA", 32))#folder artefak gabungan ubin yang disimpan di disk
+
+cache_ubin = CacheLRU(maks_entri=256)#Dataset per ubin (memory map + BallTree), dipakai bersama semua sesi
+cache_area = CacheLRU(maks_entri=8)#gabungan ubin di sekitar lokasi pengguna untuk peta dan statistik
+
+
+def nomor_ubin(lat, lon, ukuran=UKURAN_UBIN):
+    #nomor baris dan kolom ubin, grid menempel ke kelipatan ukuran dari 0,0
+    return np.floor(np.asarray(lat) / ukuran).astype(np.int64), np.floor(np.asarray(lon) / ukuran).astype(np.int64)
+
+
+def jarak_keluar_kotak(lat, lon, lat_min, lat_max, lon_min, lon_max):
+    #batas bawah jarak (km) dari titik di dalam kotak ke titik mana pun di luar kotak
+    #ke utara/selatan cukup selisih lintang, ke timur/barat pakai jarak ke lingkaran besar meridian tepi kotak
+    d_lat = min(lat - lat_min, lat_max - lat)
+    d_lon = min(lon - lon_min, lon_max - lon, 90)
+    jarak_lat = R_BUMI * math.radians(d_lat)
+    jarak_lon = R_BUMI * math.asin(min(1.0, math.sin(math.radians(d_lon)) * math.cos(math.radians(lat))))
+    return min(jarak_lat, jarak_lon)
+
+
+class DatasetUbin:
+    #satu versi dataset yang sudah dibagi menjadi ubin, yang ada di memori hanya manifest
+    #ubin dimuat saat dibutuhkan dan disimpan di cache_ubin
+
+    def __init__(self, manifest, versi, folder):
+        self.manifest = manifest
+        self.versi = versi
+        self.folder = folder
+        self.ukuran = manifest["ukuran"]
+        self.nama = list(manifest["ubin"])
+        ij = np.array([[int(x) for x in nama.split("_")] for nama in self.nama], dtype=np.int64).reshape(-1, 2)
+        self.i, self.j = ij[:, 0], ij[:, 1]
+
+    def __len__(self):
+        return self.manifest["jumlah_baris"]
+
+    def ubin(self, nama):
+        folder = os.path.join(self.folder, nama)
+        return cache_ubin.ambil((self.versi, nama), lambda: Dataset(baca_artefak(folder), f"{self.versi}-{nama}", folder))
+
+    def ubin_dalam(self, lat_min, lat_max, lon_min, lon_max):
+        #nama ubin yang beririsan dengan kotak lintang/bujur
+        i0, j0 = nomor_ubin(lat_min, lon_min, self.ukuran)
+        i1, j1 = nomor_ubin(lat_max, lon_max, self.ukuran)
+        cocok = (self.i >= i0) & (self.i <= i1) & (self.j >= j0) & (self.j <= j1)
+        return [self.nama[x] for x in np.flatnonzero(cocok)]
+
+    def area(self, lat, lon, radius_km=RADIUS_AREA_KM):
+        #Dataset gabungan ubin di sekitar lokasi pengguna, dipakai untuk peta, statistik dan metrik jarak
+        #lokasi yang berdekatan menghasilkan kumpulan ubin yang sama jadi Dataset-nya dipakai bersama
+        if len(self) <= MAKS_BARIS_SEMUA:
+            nama = self.nama
+        else:
+            d_lat = math.degrees(radius_km / R_BUMI)
+            d_lon = d_lat / max(math.cos(math.radians(lat)), 0.01)
+            nama = self.ubin_dalam(lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon)
+            if not nama and self.nama:#lokasi jauh dari semua bengkel (misal di laut), pakai cincin ubin terdekat
+                i0, j0 = nomor_ubin(lat, lon, self.ukuran)
+                cincin = np.maximum(np.abs(self.i - i0), np.abs(self.j - j0))
+                nama = [self.nama[x] for x in np.flatnonzero(cincin == cincin.min())]
+        if not nama:#dataset tanpa bengkel (misal csv hasil pembersihan yang hanya berisi header)
+            return Dataset(pd.DataFrame(columns=KOLOM_TEKS + KOLOM_KOORDINAT), f"{self.versi}-kosong", self.folder)
+        kunci = hashlib.sha1(",".join(nama).encode()).hexdigest()[:16]
+        dataset = cache_area.ambil((self.versi, kunci), lambda: self._gabung(nama, kunci))
+        if len(nama) > 1:
+            self._pakai_folder(dataset.folder)
+        return dataset
+
+    def _gabung(self, nama, kunci):
+        if len(nama) == 1:
+            return self.ubin(nama[0])
+        ubin = [self.ubin(n) for n in nama]
+        bagian = [u.df for u in ubin]
+        kolom = {k: union_categoricals([b[k] for b in bagian], ignore_order=True) for k in KOLOM_TEKS}
+        kolom.update({k: np.concatenate([b[k].to_numpy() for b in bagian]) for k in KOLOM_KOORDINAT})
+        #sel grid kepadatan tidak pernah melewati batas ubin (ukuran ubin kelipatan ukuran sel), jadi cukup disambung
+        kepadatan = {ukuran: np.concatenate([u.kepadatan[ukuran] for u in ubin]) for ukuran, _, _ in LEVEL_KEPADATAN}
+        folder = os.path.join(self.folder, f"area-{kunci}")#artefak turunan (cakupan, statistik) untuk gabungan ini
+        self._pakai_folder(folder)
+        self._bersihkan_area()
+        return Dataset(pd.DataFrame(kolom, columns=KOLOM_TEKS + KOLOM_KOORDINAT), f"{self.versi}-{kunci}", folder, kepadatan=kepadatan)
+
+    def _pakai_folder(self, folder):
+        #waktu ubah folder dipakai sebagai penanda terakhir dipakai, folder dibuat ulang kalau sudah dihapus proses lain
+        os.makedirs(folder, exist_ok=True)
+        os.utime(folder)
+
+    def _bersihkan_area(self, maks=MAKS_FOLDER_AREA):
+        #hapus folder area-* yang paling lama tidak dipakai supaya data/cache tidak terus membesar
+        #Dataset yang masih ada di memori tetap jalan, artefak yang hilang dihitung ulang kalau dibutuhkan lagi
+        folder = []
+        for path in glob.glob(os.path.join(self.folder, "area-*")):
+            try:
+                folder.append((os.path.getmtime(path), path))
+            except OSError:
+                continue#sudah dihapus proses lain
+        for _, path in sorted(folder, reverse=True)[maks:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def terdekat(self, lat, lon, k=3):
+        #k bengkel terdekat dari seluruh dataset (kolom dataset + Jarak_KM), urut dari yang paling dekat
+        #ubin diperiksa per cincin mulai dari ubin lokasi pengguna, berhenti kalau bengkel ke-k sudah lebih dekat
+        #daripada jarak minimum ke ubin mana pun di luar cincin
+        i0, j0 = nomor_ubin(lat, lon, self.ukuran)
+        cincin = np.maximum(np.abs(self.i - i0), np.abs(self.j - j0))
+        hasil, jarak = [], np.empty(0)
+        for r in np.unique(cincin):
+            for x in np.flatnonzero(cincin == r):
+                ds = self.ubin(self.nama[x])
+                posisi, jarak_ubin = ds.indeks.terdekat(lat, lon, k=k)
+                hasil.append(ds.df.iloc[posisi].assign(Jarak_KM=jarak_ubin))
+                jarak = np.concatenate([jarak, jarak_ubin])
+            if len(jarak) >= k:
+                batas = jarak_keluar_kotak(
+                    lat, lon,
+                    (i0 - r) * self.ukuran, (i0 + r + 1) * self.ukuran,
+                    (j0 - r) * self.ukuran, (j0 + r + 1) * self.ukuran,
+                )
+                if np.partition(jarak, k - 1)[k - 1] <= batas:
+                    break
+        if not hasil:
+            return pd.DataFrame(columns=KOLOM_TEKS + KOLOM_KOORDINAT + ["Jarak_KM"])
+        return pd.concat(hasil, ignore_index=True).sort_values("Jarak_KM", kind="stable", ignore_index=True).head(k)
+
+
+def bangun_ubin(csv_path, folder, ukuran=UKURAN_UBIN, chunksize=UKURAN_CHUNK):
+    #csv dibaca per chunk dan setiap baris ditulis ke csv sementara milik ubinnya, lalu tiap ubin diubah jadi artefak kolom
+    tmp = f"{folder}.tmp-{os.getpid()}"
+    folder_csv = os.path.join(tmp, "csv")
+    os.makedirs(folder_csv, exist_ok=True)
+
+    jumlah = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        lat = pd.to_numeric(chunk["Latitude"], errors="coerce").to_numpy(np.float64)
+        lon = pd.to_numeric(chunk["Longitude"], errors="coerce").to_numpy(np.float64)
+        valid = ~(np.isnan(lat) | np.isnan(lon))#baris tanpa koordinat tidak masuk ubin mana pun
+        i, j = nomor_ubin(lat[valid], lon[valid], ukuran)
+        for (a, b), bagian in chunk[valid].reindex(columns=KOLOM_TEKS + KOLOM_KOORDINAT).groupby([i, j]):
+            nama = f"{a}_{b}"
+            bagian.to_csv(os.path.join(folder_csv, f"{nama}.csv"), mode="a", header=nama not in jumlah, index=False)
+            jumlah[nama] = jumlah.get(nama, 0) + len(bagian)
+
+    manifest = {"sumber": os.path.basename(csv_path), "ukuran": ukuran, "jumlah_baris": sum(jumlah.values()), "ubin": {}}
+    for nama, n in sorted(jumlah.items()):
+        folder_ubin = os.path.join(tmp, nama)
+        bangun_artefak(os.path.join(folder_csv, f"{nama}.csv"), folder_ubin)
+        muat_kepadatan(folder_ubin, *(np.load(os.path.join(folder_ubin, f"{k}.npy")) for k in KOLOM_KOORDINAT))
+        a, b = (int(x) for x in nama.split("_"))
+        manifest["ubin"][nama] = {"jumlah": n, "batas": [a * ukuran, (a + 1) * ukuran, b * ukuran, (b + 1) * ukuran]}
+    shutil.rmtree(folder_csv)
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    try:
+        os.replace(tmp, folder)#ganti nama secara atomik supaya proses lain tidak membaca ubin setengah jadi
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)#sudah dibuat proses lain duluan
+
+
+def muat_ubin(csv_path):
+    #yang dibaca saat start hanya manifest, jadi waktu start dan memori tidak ikut membesar dengan jumlah data
+    return muat_artefak(csv_path, "-ubin", "manifest.json", bangun_ubin, buka_ubin)
+
+
+def buka_ubin(folder, versi):
+    with open(os.path.join(folder, "manifest.json"), encoding="utf-8") as f:
+        return DatasetUbin(json.load(f), versi, folder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagi dataset bengkel menjadi ubin grid lintang/bujur")
+    parser.add_argument("--csv", default="data/bengkel_honda_jateng_final.csv")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    data = muat_ubin(args.csv)
+    print(f"{len(data):,} bengkel dalam {len(data.nama)} ubin ({data.ukuran:g} derajat) siap dalam {time.perf_counter() - t0:.2f} detik")
+    print(f"Folder: {data.folder}")
+    for nama, info in sorted(data.manifest["ubin"].items(), key=lambda x: -x[1]["jumlah"])[:10]:
+        print(f"  ubin {nama}: {info['jumlah']:,} bengkel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#bandingkan ukuran payload dan waktu render peta: marker satu per satu (cara lama) vs lapisan cluster
+#cara pakai: python -m utils.ukur_peta [--lat -6.9905 --lon 110.4229] [--simpan folder] [--browser]
+#--browser mengukur perkiraan time-to-interactive di chrome headless (butuh selenium, chrome dan internet untuk script leaflet dari CDN)
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+
+import folium
+
+from utils.dataset import muat_dataset
+from utils.peta import lapisan_bengkel, marker_pengguna, marker_terdekat, popup_bengkel
+
+
+def peta_klasik(df, jarak, posisi_terdekat, user_lat, user_lon):
+    #cara lama: satu folium.Marker + popup html lengkap untuk setiap bengkel
+    m = folium.Map(location=[user_lat, user_lon], zoom_start=9)
+    marker_pengguna(user_lat, user_lon).add_to(m)
+    terdekat = set(posisi_terdekat.tolist())
+    for i, row in enumerate(df.itertuples(index=False)):
+        row = row._asdict()
+        folium.Marker(
+            location=[row['Latitude'], row['Longitude']],
+            popup=folium.Popup(popup_bengkel(row, jarak[i], user_lat, user_lon), max_width=250),
+            icon=folium.Icon(color='green' if i in terdekat else 'blue'),
+        ).add_to(m)
+    return m
+
+
+def peta_cluster(df, jarak, posisi_terdekat, user_lat, user_lon):
+    m = folium.Map(location=[user_lat, user_lon], zoom_start=9)
+    marker_pengguna(user_lat, user_lon).add_to(m)
+    lapisan_bengkel(df).add_to(m)
+    for marker in marker_terdekat(df.iloc[posisi_terdekat].assign(Jarak_KM=jarak[posisi_terdekat]), user_lat, user_lon):
+        marker.add_to(m)
+    return m
+
+
+def ukur(buat_peta, *args):
+    t0 = time.perf_counter()
+    m = buat_peta(*args)
+    t1 = time.perf_counter()
+    html = m.get_root().render()#html inilah yang dikirim st_folium ke browser
+    t2 = time.perf_counter()
+    return html, {"bangun_s": t1 - t0, "render_s": t2 - t1, "payload_kb": len(html.encode("utf-8")) / 1024}
+
+
+def waktu_interaktif(html, timeout=120):
+    #perkiraan time-to-interactive (detik): dari awal navigasi sampai browser pertama kali idle setelah event load,
+    #saat itu semua script peta sudah jalan dan marker/cluster sudah dibuat. None kalau selenium atau chrome tidak tersedia
+    try:
+        from selenium.common.exceptions import WebDriverException
+        from utils.scrap import buat_driver
+    except ImportError:
+        return None
+    try:
+        driver = buat_driver(headless=True)
+    except WebDriverException:
+        return None
+    with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as f:
+        f.write(html)
+    try:
+        driver.set_page_load_timeout(timeout)
+        driver.set_script_timeout(timeout)
+        driver.get(pathlib.Path(f.name).as_uri())#menunggu sampai event load
+        ms = driver.execute_async_script("""
+            var selesai = arguments[arguments.length - 1];
+            function idle() { requestIdleCallback(function () { selesai(performance.now()); }); }
+            if (document.readyState === "complete") { idle(); } else { window.addEventListener("load", idle); }
+        """)
+        return ms / 1000
+    finally:
+        driver.quit()
+        os.remove(f.name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/bengkel_honda_jateng_final.csv")
+    parser.add_argument("--lat", type=float, default=-6.99049680)
+    parser.add_argument("--lon", type=float, default=110.42294450)
+    parser.add_argument("--simpan", help="folder untuk menyimpan kedua file html")
+    parser.add_argument("--browser", action="store_true", help="ukur juga perkiraan time-to-interactive di chrome headless")
+    args = parser.parse_args()
+
+    dataset = muat_dataset(args.csv)
+    jarak = dataset.indeks.jarak_semua(args.lat, args.lon)
+    posisi_terdekat, _ = dataset.indeks.terdekat(args.lat, args.lon, k=3)
+
+    print(f"Jumlah bengkel: {len(dataset.df)}")
+    for nama, fungsi in [("klasik", peta_klasik), ("cluster", peta_cluster)]:
+        html, hasil = ukur(fungsi, dataset.df, jarak, posisi_terdekat, args.lat, args.lon)
+        baris = f"{nama:8s} payload {hasil['payload_kb']:9.1f} KB | bangun {hasil['bangun_s']*1000:8.1f} ms | render {hasil['render_s']*1000:8.1f} ms"
+        if args.browser:
+            tti = waktu_interaktif(html)
+            baris += " | interaktif " + (f"{tti*1000:8.1f} ms" if tti is not None else "dilewati (selenium/chrome tidak tersedia)")
+        print(baris)
+        if args.simpan:
+            os.makedirs(args.simpan, exist_ok=True)
+            with open(os.path.join(args.simpan, f"peta_{nama}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+
+
+if __name__ == "__main__":
+    main()